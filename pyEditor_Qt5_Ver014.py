@@ -1,63 +1,152 @@
-import sys, logging
+import sys
+import pyEditor_instance
+
+# 한 번만 실행 모드: 이미 떠 있는 편집기가 있으면 파일 목록만 넘기고 PyQt 를 불러오기 전에 끝냄
+if __name__ == '__main__' and pyEditor_instance.handoff(sys.argv[1:]):
+    sys.exit(0)
+
+import os, io, re, codecs, threading, time, logging, json
+from array import array
+from bisect import bisect_left
+from collections import deque
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, QFileDialog, QMessageBox,
                              QTabWidget, QVBoxLayout, QWidget, QPlainTextEdit, QHBoxLayout, QTextEdit,
-                             QFontDialog, QStatusBar, QDialog, QLabel, QLineEdit, QPushButton)
-from PyQt5.QtGui import QFont, QPainter, QIcon, QTextCursor, QTextDocument, QColor, QTextFormat, QTextCharFormat
-from PyQt5.QtCore import Qt, QSize, QRect
+                             QFontDialog, QStatusBar, QDialog, QLabel, QLineEdit, QPushButton,
+                             QAbstractScrollArea, QInputDialog, QCheckBox, QDockWidget, QTreeWidget,
+                             QTreeWidgetItem, QListView, QTableView, QHeaderView)
+from PyQt5.QtGui import (QFont, QPainter, QIcon, QTextCursor, QColor, QTextFormat, QTextCharFormat,
+                         QSyntaxHighlighter, QFontMetrics, QPixmap, QTextBlockUserData, QKeySequence)
+from PyQt5.QtCore import (Qt, QSize, QRect, QObject, QThread, QTimer, pyqtSignal, QAbstractListModel,
+                          QAbstractTableModel, QModelIndex, QEvent)
+from PyQt5.QtNetwork import QLocalServer
+
+import pyEditor_tokenizer
+import pyEditor_piecetable
+import pyEditor_fileio
+import pyEditor_search
+import pyEditor_encoding
+import pyEditor_undo
+import pyEditor_journal
+
+# 시작할 때 필요 없는 모듈은 처음 쓰는 함수 안에서 import 함 (첫 화면까지의 시간 단축)
+#   pyEditor_bigfile (numpy), pyEditor_findfiles (프로세스 풀), pyEditor_codeindex (sqlite3), multiprocessing
+imported_at = time.time()   # 시작 시간 측정용 (StartupProbe)
 
 ''' test remark'''
 
 def setup_logging():
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', 
-                        handlers=[logging.FileHandler('pyEEditor_log.log'), logging.StreamHandler()])
+                        handlers=[logging.FileHandler('pyEEditor_log.log', delay=True), logging.StreamHandler()])
 
 class LineNumberArea(QWidget):
-    def __init__(self, editor):
-        super().__init__(editor)
-        self.editor = editor
+    # 페인트 경로 추적 로그 (보기 메뉴에서 실행 중에 켜고 끔, 꺼져 있으면 비용 없음)
+    trace_paint = False
+
+    # 폰트별로 미리 그려 둔 숫자(0~9) 이미지 캐시
+    digit_cache = {}
+
+    def __init__(self, text_area, parent=None):
+        super().__init__(parent)
+        self.text_area = text_area  # 이 줄 번호 영역이 붙은 편집기 (탭마다 하나 - 현재 탭의 편집기가 아님)
         self.scroll_value = 0
+        self.width_key = None   # 폭 계산에 쓴 (자릿수, 폰트)
+
+    def digit_pixmaps(self, font):
+        ratio = self.devicePixelRatioF()
+        key = (font.key(), ratio)
+        cached = LineNumberArea.digit_cache.get(key)
+        if cached is not None:
+            return cached
+
+        metrics = QFontMetrics(font)
+        digit_width = max(metrics.horizontalAdvance(str(digit)) for digit in range(10))
+        digit_height = metrics.height()
+
+        pixmaps = []
+        for digit in range(10):
+            pixmap = QPixmap(int(digit_width * ratio), int(digit_height * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+
+            painter = QPainter(pixmap)
+            painter.setFont(font)
+            painter.setPen(Qt.black)
+            painter.drawText(QRect(0, 0, digit_width, digit_height), Qt.AlignCenter, str(digit))
+            painter.end()
+            pixmaps.append(pixmap)
+
+        cached = (pixmaps, digit_width)
+        LineNumberArea.digit_cache[key] = cached
+        return cached
 
     def paintEvent(self, event):
+        # 다시 그려야 하는 영역(event.rect())에 걸친 블록만 그림
+        rect = event.rect()
         painter = QPainter(self)
-        painter.fillRect(event.rect(), Qt.lightGray)
+        painter.fillRect(rect, Qt.lightGray)
 
-        block = self.editor.text_area.firstVisibleBlock()
-        block_number = block.blockNumber()
+        text_area = self.text_area
+        pixmaps, digit_width = self.digit_pixmaps(text_area.font())
+        right = self.width() - 5
 
-        top = self.editor.text_area.blockBoundingGeometry(block).translated(self.editor.text_area.contentOffset()).top()
-        bottom = int(top) + self.editor.text_area.blockBoundingRect(block).height()
+        block = text_area.firstVisibleBlock()
+        top = text_area.blockBoundingGeometry(block).translated(text_area.contentOffset()).top()
+        painted = 0
 
-        logger.info('paintEvent top float :%d'%top)
-        logger.info('paintEvent top float :%d'%int(top))
-        logger.info('paintEvent bottom:%d'%bottom)
-        logger.info('paintEvent bottom2:%d'%bottom)
+        while block.isValid() and top <= rect.bottom():
+            bottom = top + text_area.blockBoundingRect(block).height()
 
-        # Adjust position and font
-        font = self.editor.text_area.font()
-        painter.setFont(font)
-        painter.setPen(Qt.black)
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1) # Add a space after the number
-                painter.drawText(0, int(top), self.width() - 5, font.pointSize() + 4, Qt.AlignRight, number)
+            if block.isVisible() and bottom >= rect.top():
+                number = str(block.blockNumber() + 1)
+                x = right - digit_width * len(number)
+                y = int(top)
+                for ch in number:
+                    painter.drawPixmap(x, y, pixmaps[ord(ch) - 48])
+                    x += digit_width
+                painted += 1
 
             block = block.next()
             top = bottom
-            bottom = int(top) + self.editor.text_area.blockBoundingRect(block).height()
-            block_number += 1
+
+        if LineNumberArea.trace_paint:
+            logger.debug('paintEvent rect: %s, painted blocks: %d', rect, painted)
 
     def sizeHint(self):
-        return QSize(50, self.editor.text_area.height())
+        return QSize(50, self.text_area.height())
 
     def scrollEvent(self, event):
-        scrollbar = self.editor.text_area.verticalScrollBar()
+        scrollbar = self.text_area.verticalScrollBar()
         self.scroll_value = scrollbar.value()
         scrollbar.setValue(self.scroll_value)
         self.update()
 
 
+class SearchWorker(QThread):
+    # 문서 스냅샷을 작업 스레드에서 훑고, 찾은 결과를 조각마다 GUI 로 보냄
+    matches_found = pyqtSignal(list)
+
+    def __init__(self, snapshot, pattern, ranges, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.pattern = pattern
+        self.ranges = ranges
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        for start, end in self.ranges:
+            for matches in pyEditor_search.search_slices(self.snapshot, self.pattern, start, end):
+                if self.isInterruptionRequested():
+                    return
+                if matches:
+                    self.matches_found.emit(matches)
+
+
 class FindDialog(QDialog):
+    # 색인이 아직 이만큼 넘게 밀려 있으면 색인 대신 작업 스레드로 찾음
+    MAX_PENDING_BLOCKS = 10000
+
     def __init__(self, parent=None):
         super(FindDialog, self).__init__(editor)
         self.setWindowTitle('찾기')
@@ -67,47 +156,684 @@ class FindDialog(QDialog):
 
         self.find_label = QLabel('찾을 내용:')
         self.find_text_value = QLineEdit()
+        self.regex_check = QCheckBox('정규식')
+        self.case_check = QCheckBox('대소문자 구분')
+        self.word_check = QCheckBox('단어 단위')
         self.find_button = QPushButton('찾기')
         self.find_button.clicked.connect(self.find_text)
+        self.find_all_button = QPushButton('모두 찾기')
+        self.find_all_button.clicked.connect(self.find_all)
+        self.replace_label = QLabel('바꿀 내용:')
+        self.replace_text_value = QLineEdit()
+        self.replace_all_button = QPushButton('모두 바꾸기')
+        self.replace_all_button.clicked.connect(self.replace_all)
+        self.result_label = QLabel('')
+
+        options = QHBoxLayout()
+        options.addWidget(self.regex_check)
+        options.addWidget(self.case_check)
+        options.addWidget(self.word_check)
 
         layout.addWidget(self.find_label)
         layout.addWidget(self.find_text_value)
+        layout.addLayout(options)
         layout.addWidget(self.find_button)
+        layout.addWidget(self.find_all_button)
+        layout.addWidget(self.replace_label)
+        layout.addWidget(self.replace_text_value)
+        layout.addWidget(self.replace_all_button)
+        layout.addWidget(self.result_label)
 
         self.setLayout(layout)
         self.editor = editor
 
+        # 입력할 때마다 찾되, 빠르게 치는 동안에는 마지막 입력만 찾음
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.start_incremental_search)
+
+        self.find_text_value.textChanged.connect(self.search_timer.start)
+        self.regex_check.toggled.connect(self.search_timer.start)
+        self.case_check.toggled.connect(self.search_timer.start)
+        self.word_check.toggled.connect(self.search_timer.start)
+
+        self.worker = None
+        self.matches = []           # [(버퍼 위치, 길이), ...]
+        self.matches_revision = None  # 검색이 끝났을 때의 문서 revision (끝나기 전에는 None)
+
+        self.finished.connect(self.clear_highlight)
+
+    def current_pattern(self):
+        return pyEditor_search.compile_query(self.find_text_value.text(), self.regex_check.isChecked(),
+                                             self.case_check.isChecked(), self.word_check.isChecked())
+
+    def uses_index(self, text_area):
+        # 일반 텍스트 검색(3글자 이상)은 트라이그램 색인으로 바로 답함
+        return (not self.regex_check.isChecked() and not self.word_check.isChecked()
+                and len(self.find_text_value.text()) >= pyEditor_search.GRAM
+                and len(text_area.search_index.pending) <= self.MAX_PENDING_BLOCKS)
+
+    def cancel_search(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
+    def start_incremental_search(self):
+        self.search_timer.stop()
+        self.cancel_search()
+        self.matches = []
+        self.matches_revision = None
+
+        text_to_find = self.find_text_value.text()
+        text_area = self.editor.text_area if self.editor is not None else None
+
+        if not isinstance(text_area, MyTextEdit):
+            return
+        if not text_to_find:
+            text_area.set_match_highlight(None)
+            self.result_label.setText('')
+            return
+
+        try:
+            pattern = self.current_pattern()
+        except re.error as e:
+            text_area.set_match_highlight(None)
+            self.result_label.setText(f'잘못된 정규식: {e}')
+            return
+
+        # 화면에 보이는 일치 항목은 바로 강조
+        text_area.set_match_highlight(pattern)
+        revision = text_area.document().revision()
+
+        if self.uses_index(text_area):
+            positions = text_area.search_index.find_all(text_to_find, self.case_check.isChecked())
+            self.matches = [(position, len(text_to_find)) for position in positions]
+            self.matches_revision = revision
+            self.result_label.setText(f'{len(self.matches)}개 찾음')
+            return
+
+        # 나머지는 스냅샷을 작업 스레드에서 화면 구간부터 찾음
+        snapshot = text_area.buffer.snapshot()
+        start, end = text_area.visible_range()
+        worker = SearchWorker(snapshot, pattern, pyEditor_search.viewport_first(len(snapshot), start, end), self)
+        worker.matches_found.connect(lambda matches: self.add_matches(worker, matches))
+        worker.finished.connect(lambda: self.search_finished(worker, revision))
+        worker.finished.connect(worker.deleteLater)
+        self.worker = worker
+        self.result_label.setText('찾는 중...')
+        worker.start()
+
+    def add_matches(self, worker, matches):
+        if worker is self.worker:
+            self.matches.extend(matches)
+            self.result_label.setText(f'{len(self.matches)}개 찾는 중...')
+
+    def search_finished(self, worker, revision):
+        if worker is self.worker:
+            self.worker = None
+            self.matches.sort()
+            self.matches_revision = revision
+            self.result_label.setText(f'{len(self.matches)}개 찾음')
+
+    def next_match(self, text_area, position):
+        # position 뒤의 첫 일치 항목 (끝까지 없으면 처음부터)
+        if self.matches_revision == text_area.document().revision():
+            if not self.matches:
+                return None
+            index = bisect_left(self.matches, (position, 0))
+            return self.matches[index if index < len(self.matches) else 0]
+
+        # 검색이 끝나지 않았거나 문서가 바뀌었으면 커서 뒤부터 차례로 찾음
+        pattern = self.current_pattern()
+        snapshot = text_area.buffer.snapshot()
+        for start, end in ((position, len(snapshot)), (0, position)):
+            for matches in pyEditor_search.search_slices(snapshot, pattern, start, end):
+                if matches:
+                    return matches[0]
+        return None
+
     def find_text(self):
         text_to_find = self.find_text_value.text()
 
-        if self.editor is not None and text_to_find:
-            cursor = self.editor.text_area.textCursor()
-            found = self.editor.text_area.find(text_to_find, QTextDocument.FindFlags())
+        if self.editor is not None and self.editor.text_area is not None and text_to_find:
+            text_area = self.editor.text_area
+
+            if isinstance(text_area, MyTextEdit):
+                cursor = text_area.textCursor()
+                position = text_area.to_buffer(cursor.selectionEnd() if cursor.hasSelection() else cursor.position())
+
+                try:
+                    if self.uses_index(text_area):
+                        # 탭마다 유지하는 색인에서 바로 찾음
+                        positions = text_area.search_index.find_all(text_to_find, self.case_check.isChecked())
+                        index = bisect_left(positions, position)
+                        match = (positions[index % len(positions)], len(text_to_find)) if positions else None
+                    else:
+                        match = self.next_match(text_area, position)
+                except re.error as e:
+                    self.result_label.setText(f'잘못된 정규식: {e}')
+                    return
+
+                found = match is not None
+                if found:
+                    cursor.setPosition(text_area.to_document(match[0]))
+                    cursor.setPosition(text_area.to_document(match[0] + match[1]), QTextCursor.KeepAnchor)
+                    text_area.setTextCursor(cursor)
+            else:
+                # 큰 파일 뷰어는 작업 스레드에서 찾고, 끝나면 커서를 옮김
+                self.result_label.setText('찾는 중...')
+                text_area.search(text_to_find, False, self.viewer_found)
+                return
 
             if found:
-                self.editor.text_area.ensureCursorVisible()
+                text_area.ensureCursorVisible()
             else:
                 QMessageBox.information(self, '찾기', '텍스트를 찾을 수 없습니다.')
 
+    def viewer_found(self, offset):
+        self.result_label.setText('')
+        if offset < 0:
+            QMessageBox.information(self, '찾기', '텍스트를 찾을 수 없습니다.')
+
+    def find_all(self):
+        # 일반 텍스트는 색인으로, 나머지는 작업 스레드로 세고 강조는 화면에 보이는 줄에만 함
+        text_to_find = self.find_text_value.text()
+
+        if self.editor is not None and self.editor.text_area is not None and text_to_find:
+            text_area = self.editor.text_area
+
+            if isinstance(text_area, MyTextEdit):
+                self.start_incremental_search()
+                try:
+                    self.editor.results_panel().start(text_area, self.current_pattern())
+                except re.error:
+                    pass
+            else:
+                self.result_label.setText('세는 중...')
+                text_area.search(text_to_find, True, lambda count: self.result_label.setText(f'{count}개 찾음'))
+
+    def replace_all(self):
+        text_to_find = self.find_text_value.text()
+        text_area = self.editor.text_area if self.editor is not None else None
+
+        if not text_to_find or not isinstance(text_area, MyTextEdit) or text_area.isReadOnly():
+            return
+
+        try:
+            pattern = self.current_pattern()
+        except re.error as e:
+            self.result_label.setText(f'잘못된 정규식: {e}')
+            return
+
+        import pyEditor_findfiles
+        replacer = pyEditor_findfiles.make_replacer(self.replace_text_value.text(), self.regex_check.isChecked())
+        try:
+            count = text_area.replace_all(pattern, replacer)
+        except (re.error, IndexError) as e:
+            # 정규식 바꿀 내용의 잘못된 그룹 참조 (\3 등)
+            self.result_label.setText(f'바꿀 수 없습니다: {e}')
+            return
+        self.result_label.setText(f'{count}개 바꿈')
+
+    def clear_highlight(self):
+        self.search_timer.stop()
+        if self.worker is not None:
+            worker = self.worker
+            self.cancel_search()
+            worker.wait()
+        if self.editor is not None and isinstance(self.editor.text_area, MyTextEdit):
+            self.editor.text_area.set_match_highlight(None)
+
+
+class ResultsWorker(QThread):
+    # 모두 찾기 결과 목록용 - 스냅샷을 처음부터 훑어서 조각마다 (줄, 열, 길이, 줄 시작) array 를 보냄
+    found = pyqtSignal(object)
+
+    def __init__(self, snapshot, pattern, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.pattern = pattern
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        for arrays in pyEditor_search.search_lines(self.snapshot, self.pattern):
+            if self.isInterruptionRequested():
+                return
+            if arrays[0]:
+                self.found.emit(arrays)
+
+
+class SearchResultsModel(QAbstractTableModel):
+    # 찾은 위치를 (파일 번호, 줄, 열, 길이) array 로만 보관하고, 표시할 글자는 보이는 행에만 만듦
+    # 한 행에 24바이트 - 천만 개여도 수백 MB 안쪽이고 ExtraSelection 같은 객체를 만들지 않음
+    HEADERS = ['파일', '줄', '열', '내용']
+    MAX_TEXT = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.clear_arrays()
+
+    def clear_arrays(self):
+        self.sources = []           # 파일 번호 -> (이름, 줄 내용을 읽을 스냅샷)
+        self.file_ids = array('i')
+        self.lines = array('i')
+        self.columns = array('i')
+        self.lengths = array('i')
+        self.line_starts = array('q')   # 줄 내용을 읽기 위한 줄 시작 위치
+
+    def clear(self):
+        self.beginResetModel()
+        self.clear_arrays()
+        self.endResetModel()
+
+    def add_source(self, name, reader):
+        self.sources.append((name, reader))
+        return len(self.sources) - 1
+
+    def add_matches(self, file_id, arrays):
+        lines, columns, lengths, line_starts = arrays
+        first = len(self.lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self.file_ids.extend(array('i', [file_id]) * len(lines))
+        self.lines.extend(lines)
+        self.columns.extend(columns)
+        self.lengths.extend(lengths)
+        self.line_starts.extend(line_starts)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def line_text(self, row):
+        reader = self.sources[self.file_ids[row]][1]
+        start = self.line_starts[row]
+        text = reader.text(start, start + self.MAX_TEXT)
+        return text.split('\n', 1)[0]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        row = index.row()
+        column = index.column()
+        if column == 0:
+            return self.sources[self.file_ids[row]][0]
+        if column == 1:
+            return self.lines[row] + 1
+        if column == 2:
+            return self.columns[row] + 1
+        return self.line_text(row).strip()
+
+    def location(self, row):
+        # (파일 번호, 줄, 열, 길이)
+        return self.file_ids[row], self.lines[row], self.columns[row], self.lengths[row]
+
+
+class SearchResultsPanel(QDockWidget):
+    # 찾기 창의 "모두 찾기" 결과 목록
+    # QTreeView 는 행이 늘 때마다 전체 행 배치를 다시 하므로, 행 높이를 고정한 QTableView 를 씀
+    def __init__(self, parent=None):
+        super().__init__('찾기 결과', parent)
+        self.editor = parent
+        self.worker = None
+        self.text_areas = []        # 파일 번호 -> 찾은 편집기
+
+        self.model = SearchResultsModel(self)
+        self.view = QTableView()
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(self.view.fontMetrics().height() + 4)
+        self.view.verticalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.setSelectionBehavior(QTableView.SelectRows)
+        self.view.setModel(self.model)
+        self.view.activated.connect(self.open_result)
+        self.view.clicked.connect(self.open_result)
+        self.status_label = QLabel('')
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.view)
+        widget = QWidget()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+    def stop(self):
+        if self.worker is not None:
+            worker = self.worker
+            self.worker = None
+            worker.cancel()
+            worker.wait()
+
+    def start(self, text_area, pattern):
+        self.stop()
+        self.model.clear()
+        self.text_areas = [text_area]
+
+        state = self.editor.current_state()
+        name = state.path if state is not None and state.path else self.editor.tabs.tabText(self.editor.tabs.currentIndex())
+        snapshot = text_area.buffer.snapshot()
+        file_id = self.model.add_source(name, snapshot)
+
+        worker = ResultsWorker(snapshot, pattern, self)
+        worker.found.connect(lambda arrays: self.add_matches(worker, file_id, arrays))
+        worker.finished.connect(lambda: self.search_finished(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.worker = worker
+        self.status_label.setText('찾는 중...')
+        self.show()
+        worker.start()
+
+    def add_matches(self, worker, file_id, arrays):
+        if worker is self.worker:
+            self.model.add_matches(file_id, arrays)
+            self.status_label.setText(f'{self.model.rowCount()}개 찾는 중...')
+
+    def search_finished(self, worker):
+        if worker is self.worker:
+            self.worker = None
+            self.status_label.setText(f'{self.model.rowCount()}개 찾음')
+
+    def open_result(self, index):
+        file_id, line, column, length = self.model.location(index.row())
+        text_area = self.text_areas[file_id]
+        for tab_widget, state in self.editor.tab_states.items():
+            if state.editor is text_area:
+                self.editor.tabs.setCurrentWidget(tab_widget)
+                break
+        else:
+            return  # 이미 닫힌 탭
+
+        # 결과의 줄/열은 코드 포인트 단위 - 버퍼의 줄 색인으로 위치를 찾아서 문서 위치로 바꿈
+        buffer = text_area.buffer
+        count = buffer.line_count()
+        if line < count:
+            start = buffer.line_start(line)
+            end = buffer.line_start(line + 1) - 1 if line + 1 < count else len(buffer)
+            cursor = text_area.textCursor()
+            cursor.setPosition(text_area.to_document(min(start + column, end)))
+            cursor.setPosition(text_area.to_document(min(start + column + length, end)), QTextCursor.KeepAnchor)
+            text_area.setTextCursor(cursor)
+            text_area.centerCursor()
+
+
+# BMP 밖 문자 (Qt 문서에서는 UTF-16 서로게이트 쌍이라 2칸을 차지함)
+ASTRAL_RE = re.compile('[\U00010000-\U0010ffff]')
+
+
+def utf16_column(text, column):
+    # 블록 텍스트의 열 (코드 포인트) -> 블록 안 문서 위치 (UTF-16)
+    if text.isascii():
+        return column
+    return column + len(ASTRAL_RE.findall(text, 0, column))
+
+
+class BlockData(QTextBlockUserData):
+    # 블록마다 붙이는 고정 id (블록 번호는 편집하면 바뀌므로 색인에는 id 를 씀)
+    # words: 단어 -> 열 목록 (블록 revision 이 words_revision 과 다르면 다시 만듦)
+    def __init__(self, block_id):
+        super().__init__()
+        self.block_id = block_id
+        self.words = None
+        self.words_revision = -1
+
+
+class DocumentSearchIndex(QObject):
+    # 탭 하나의 트라이그램 색인 - 바뀐 블록만 모아 두었다가 타이머로 조금씩 색인함
+    SLICE_SECONDS = 0.005
+
+    def __init__(self, document, buffer, to_buffer, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self.buffer = buffer    # 3글자 미만 검색은 piece table 스냅샷에서 직접 찾음
+        self.to_buffer = to_buffer  # 블록 위치 (UTF-16) -> 버퍼 위치
+        self.index = pyEditor_search.TrigramIndex()
+        self.blocks = {}        # id -> QTextBlock (색인된 블록)
+        self.pending = {}       # id -> QTextBlock (아직 색인하지 않은 블록)
+        self.next_id = 0
+        self.results = None     # 마지막 검색 결과 (query, case_sensitive, revision, positions)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.index_step)
+
+        document.contentsChange.connect(self.mark_changed)
+        self.mark_changed(0, 0, document.characterCount())
+
+    def block_id(self, block):
+        data = block.userData()
+        if isinstance(data, BlockData):
+            return data.block_id
+
+        self.next_id += 1
+        block.setUserData(BlockData(self.next_id))
+        return self.next_id
+
+    @staticmethod
+    def is_live(block, block_id):
+        # 지워진 블록의 핸들이 다른 블록을 가리킬 수 있어서 id 까지 확인
+        if not block.isValid():
+            return False
+        data = block.userData()
+        return isinstance(data, BlockData) and data.block_id == block_id
+
+    def mark_changed(self, position, removed, added):
+        self.results = None
+
+        block = self.document.findBlock(position)
+        end = self.document.findBlock(position + added)
+        while block.isValid():
+            self.pending[self.block_id(block)] = block
+            if block == end:
+                break
+            block = block.next()
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def index_step(self):
+        deadline = time.perf_counter() + self.SLICE_SECONDS
+        pending = self.pending
+
+        while pending and time.perf_counter() < deadline:
+            for _ in range(min(256, len(pending))):
+                block_id, block = pending.popitem()
+                if self.is_live(block, block_id):
+                    self.index.add(block_id, block.text(), replacing=block_id in self.blocks)
+                    self.blocks[block_id] = block
+
+        if not pending:
+            self.timer.stop()
+            # 바뀌거나 지워진 블록의 옛 항목이 너무 많아지면 처음부터 다시 색인
+            if self.index.needs_rebuild() or len(self.blocks) > 2 * self.document.blockCount() + 1024:
+                self.rebuild()
+
+    def rebuild(self):
+        self.index.clear()
+        self.blocks = {}
+        block = self.document.firstBlock()
+        while block.isValid():
+            self.pending[self.block_id(block)] = block
+            block = block.next()
+        self.timer.start()
+
+    def find_all(self, query, case_sensitive=False):
+        # query 가 나오는 모든 버퍼 위치 (정렬됨). 같은 문서 상태에서 같은 검색은 다시 계산하지 않음
+        revision = self.document.revision()
+        if self.results is not None and self.results[:3] == (query, case_sensitive, revision):
+            return self.results[3]
+
+        candidates = self.index.candidates(query)
+        if candidates is None:
+            # 3글자 미만은 색인으로 좁힐 수 없으므로 버퍼 전체에서 바로 찾음
+            text = self.buffer.snapshot().text()
+            positions = pyEditor_search.find_in_line(text, query, case_sensitive)
+            self.results = (query, case_sensitive, revision, positions)
+            return positions
+
+        live = {}
+        for block_id in candidates:
+            block = self.blocks.get(block_id)
+            if block is not None and self.is_live(block, block_id):
+                live[block_id] = block
+        # 아직 색인하지 못한 블록은 직접 확인
+        for block_id, block in self.pending.items():
+            if self.is_live(block, block_id):
+                live[block_id] = block
+
+        positions = []
+        for block in live.values():
+            columns = pyEditor_search.find_in_line(block.text(), query, case_sensitive)
+            if columns:
+                start = self.to_buffer(block.position())
+                positions.extend(start + column for column in columns)
+        positions.sort()
+
+        self.results = (query, case_sensitive, revision, positions)
+        return positions
+
 
 class MyTextEdit(QPlainTextEdit):
+    # 커서 아래 단어와 같은 단어를 모두 강조 (보기 메뉴에서 켜고 끔)
+    highlight_occurrences = True
+    WORD_RE = re.compile(r'(?!\d)\w+')
+    OCCURRENCE_MARGIN = 20      # 화면 위아래로 이만큼의 블록까지 미리 찾아 둠
+    undo_budget = 32 * 1024 * 1024  # 탭마다 메모리에 두는 실행 취소 기록 크기 (넘으면 임시 파일로)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setLineWrapMode(QPlainTextEdit.NoWrap)
         self.cursorPositionChanged.connect(self.highlight_current_line)
         self.setStyleSheet("background-color: white;")  # 흐린 회색 배경색 설정
 
-        # 파이썬 키워드
-        self.python_keywords = [
-            'and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue', 'def', 'del',
-            'elif', 'else', 'except', 'False', 'finally', 'for', 'from', 'global', 'if', 'import',
-            'in', 'is', 'lambda', 'None', 'nonlocal', 'not', 'or', 'pass', 'raise', 'return',
-            'True', 'try', 'while', 'with', 'yield'
-        ]
-
-        # 파이썬 연산자 추가
-        self.python_operators = ['+', '-', '*', '/', '%', '**', '//', '=', '==', '!=', '<', '>', '<=', '>=']
-
+        # 구문 강조는 QSyntaxHighlighter 가 블록 단위로 처리 (문서 포맷/undo 스택을 건드리지 않음)
+        self.highlighter = PythonHighlighter(self.document())
+
+        # 화면용 QTextDocument 와 별도로 piece table 버퍼를 유지 (저장/검색은 스냅샷 사용)
+        self.buffer = pyEditor_piecetable.PieceTable()
+        self.document().contentsChange.connect(self.sync_buffer)
+
+        # Qt 문서 위치는 UTF-16 단위라 BMP 밖 문자(이모지 등)는 2칸, 버퍼에서는 1칸
+        # 그런 문자의 문서 위치를 정렬해서 들고 있다가 위치를 서로 바꿀 때 씀 (없으면 두 위치가 같음)
+        self.document_length = 0
+        self.astral = []
+
+        # 실행 취소는 QTextDocument 의 무제한 스택 대신 pyEditor_undo 로 기록
+        # (버퍼와 같이 바뀐 텍스트만 받으므로 서식 변경은 기록되지 않음)
+        self.document().setUndoRedoEnabled(False)
+        self.history = pyEditor_undo.UndoHistory(self.undo_budget)
+        self.recording = True
+
+        # 자동 저장 기록 (불러오기가 끝난 뒤 TextEditor 가 연결함)
+        self.journal = None
+        self.journal_id = 0
+
+        # 찾기용 트라이그램 색인과, 찾기 창에서 강조할 검색 패턴
+        self.search_index = DocumentSearchIndex(self.document(), self.buffer, self.to_buffer, self)
+        self.match_pattern = None
+        self.verticalScrollBar().valueChanged.connect(self.highlight_current_line)
+
+        # 단어 강조 결과 캐시: (단어, 문서 revision, 첫 블록, 끝 블록, selections)
+        # 화면이 이 블록 범위 안에 있고 단어/문서가 그대로면 다시 찾지 않음
+        self.occurrences = None
+
+    def sync_buffer(self, position, removed, added):
+        # Qt 가 알려주는 removed/added 는 마지막 문단 구분자 때문에 1 씩 클 때가 있어서
+        # 실제 문서 길이로 보정함 (여기까지는 모두 UTF-16 단위)
+        new_length = self.document().characterCount() - 1
+        added = max(0, min(position + added, new_length) - position)
+        removed = self.document_length - new_length + added
+        self.document_length = new_length
+
+        text = ''
+        if added:
+            cursor = QTextCursor(self.document())
+            cursor.setPosition(position)
+            cursor.setPosition(position + added, QTextCursor.KeepAnchor)
+            text = cursor.selectedText().replace('\u2029', '\n')
+
+        # 버퍼/실행 취소 기록/자동 저장 기록은 코드 포인트 단위로 바꿔서 씀
+        start = self.to_buffer(position)
+        astral = self.astral
+        if astral or not text.isascii():
+            first = bisect_left(astral, position)
+            last = bisect_left(astral, position + removed)
+            shift = added - removed
+            removed -= last - first
+            inserted = [position + match.start() + i for i, match in enumerate(ASTRAL_RE.finditer(text))]
+            astral[first:] = inserted + [offset + shift for offset in astral[last:]]
+
+        if self.recording:
+            self.history.record(start, self.buffer.text(start, start + removed), text)
+        if self.journal is not None:
+            self.journal.delta(self.journal_id, start, removed, text)
+        self.buffer.replace(start, removed, text)
+
+    def to_buffer(self, position):
+        # 문서 위치 (UTF-16) -> 버퍼 위치 (코드 포인트)
+        return position - bisect_left(self.astral, position)
+
+    def to_document(self, offset):
+        # 버퍼 위치 (코드 포인트) -> 문서 위치 (UTF-16). i 번째 BMP 밖 문자의 버퍼 위치는 astral[i] - i
+        astral = self.astral
+        low, high = 0, len(astral)
+        while low < high:
+            middle = (low + high) // 2
+            if astral[middle] - middle < offset:
+                low = middle + 1
+            else:
+                high = middle
+        return offset + low
+
+    def set_recording(self, enabled):
+        # 불러오는 동안에는 기록하지 않고, 다 불러오면 기록을 비우고 다시 시작
+        self.recording = enabled
+        self.history.clear()
+
+    def mark_saved(self):
+        self.history.mark_clean()
+        self.document().setModified(False)
+
+    def apply_history(self, diffs, undoing):
+        if not diffs:
+            return
+        self.recording = False
+        cursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        for position, removed, added in (reversed(diffs) if undoing else diffs):
+            old, new = (added, removed) if undoing else (removed, added)
+            cursor.setPosition(self.to_document(position))
+            cursor.setPosition(self.to_document(position + len(old)), QTextCursor.KeepAnchor)
+            cursor.insertText(new)
+        cursor.endEditBlock()
+        self.recording = True
+
+        self.setTextCursor(cursor)
+        self.document().setModified(not self.history.is_clean())
+
+    def undo(self):
+        self.apply_history(self.history.undo(), True)
+
+    def redo(self):
+        self.apply_history(self.history.redo(), False)
+
+    def keyPressEvent(self, event):
+        # 문서의 실행 취소 스택을 껐으므로 단축키를 직접 처리
+        if event.matches(QKeySequence.Undo):
+            self.undo()
+        elif event.matches(QKeySequence.Redo):
+            self.redo()
+        else:
+            super().keyPressEvent(event)
 
     def highlight_current_line(self):
         extra_selections = []
@@ -121,56 +847,1094 @@ class MyTextEdit(QPlainTextEdit):
         selection.cursor.clearSelection()
 
         extra_selections.append(selection)
+        extra_selections.extend(self.occurrence_selections())
+        extra_selections.extend(self.visible_match_selections())
         self.setExtraSelections(extra_selections)
 
-        # 현재 텍스트 내용을 스캔하며 각 언어의 키워드를 찾아 구문 강조
-        self.highlight_python_keywords()
-
-    def highlight_python_keywords(self):
+    def word_under_cursor(self):
         cursor = self.textCursor()
-        block = cursor.block()  # 현재 커서의 블록을 가져옴
-        text = block.text()
-
-        # 파이썬 키워드 강조
-        for keyword in self.python_keywords:
-            index = text.find(keyword)
-            while index >= 0:
-                cursor.setPosition(block.position() + index)
-                cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, len(keyword))
-                format = QTextCharFormat()
-                format.setForeground(QColor("blue"))  # Python 키워드는 파란색으로 강조
-                cursor.setCharFormat(format)
-                index = text.find(keyword, index + len(keyword))
-
-        # 파이썬 연산자 강조
-        for op in self.python_operators:
-            index = text.find(op)
-            while index >= 0:
-                cursor.setPosition(block.position() + index)
-                cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, len(op))
-                format = QTextCharFormat()
-                format.setForeground(QColor("green"))  # Python 연산자는 녹색으로 강조
-                cursor.setCharFormat(format)
-                index = text.find(op, index + len(op))
-
-        # 주석 강조
+        if cursor.hasSelection():
+            return None
+        column = self.to_buffer(cursor.position()) - self.to_buffer(cursor.block().position())
+        for match in self.WORD_RE.finditer(cursor.block().text()):
+            if match.start() <= column <= match.end():
+                return match.group()
+            if match.start() > column:
+                break
+        return None
+
+    def block_words(self, block):
+        # 블록의 단어 색인 - 블록이 바뀌지 않았으면 다시 만들지 않음
+        data = block.userData()
+        if not isinstance(data, BlockData):
+            self.search_index.block_id(block)
+            data = block.userData()
+
+        if data.words_revision != block.revision():
+            words = {}
+            for match in self.WORD_RE.finditer(block.text()):
+                words.setdefault(match.group(), []).append(match.start())
+            data.words = words
+            data.words_revision = block.revision()
+        return data.words
+
+    def occurrence_selections(self):
+        word = self.word_under_cursor() if self.highlight_occurrences else None
+        if word is None:
+            self.occurrences = None
+            return []
+
+        first = self.firstVisibleBlock().blockNumber()
+        last = first
+        for block in self.visible_blocks():
+            last = block.blockNumber()
+
+        revision = self.document().revision()
+        cached = self.occurrences
+        if (cached is not None and cached[0] == word and cached[1] == revision
+                and cached[2] <= first and last <= cached[3]):
+            return cached[4]
+
+        first = max(0, first - self.OCCURRENCE_MARGIN)
+        last += self.OCCURRENCE_MARGIN
+        selections = []
+        color = QColor(135, 206, 250, 90)
+
+        block = self.document().findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            text = block.text()
+            for column in self.block_words(block).get(word, ()):
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(color)
+                selection.cursor = QTextCursor(block)
+                selection.cursor.setPosition(block.position() + utf16_column(text, column))
+                selection.cursor.setPosition(block.position() + utf16_column(text, column + len(word)),
+                                             QTextCursor.KeepAnchor)
+                selections.append(selection)
+            block = block.next()
+
+        self.occurrences = (word, revision, first, last, selections)
+        return selections
+
+    def set_match_highlight(self, pattern):
+        self.match_pattern = pattern
+        self.highlight_current_line()
+
+    def visible_blocks(self):
+        block = self.firstVisibleBlock()
+        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+        bottom = self.viewport().height()
+
+        while block.isValid() and top <= bottom:
+            yield block
+            top += self.blockBoundingRect(block).height()
+            block = block.next()
+
+    def visible_range(self):
+        # 화면에 보이는 글자 범위 (버퍼 위치 시작, 끝)
+        start = end = self.firstVisibleBlock().position()
+        for block in self.visible_blocks():
+            end = block.position() + block.length()
+        return self.to_buffer(start), self.to_buffer(min(end, self.document().characterCount() - 1))
+
+    def visible_match_selections(self):
+        # 화면에 보이는 블록에서만 패턴을 찾아 강조 (문서 전체를 훑지 않음)
+        selections = []
+        if self.match_pattern is None:
+            return selections
+
+        match_color = QColor(255, 255, 0, 120)
+        for block in self.visible_blocks():
+            text = block.text()
+            for match in self.match_pattern.finditer(text):
+                if match.end() == match.start():
+                    continue
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(match_color)
+                selection.cursor = QTextCursor(block)
+                selection.cursor.setPosition(block.position() + utf16_column(text, match.start()))
+                selection.cursor.setPosition(block.position() + utf16_column(text, match.end()),
+                                             QTextCursor.KeepAnchor)
+                selections.append(selection)
+
+        return selections
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.match_pattern is not None:
+            self.highlight_current_line()
+
+    def go_to_line(self, number):
+        # 줄 위치는 piece table 의 줄 색인에서 찾음
+        if 0 <= number < self.buffer.line_count():
+            cursor = self.textCursor()
+            cursor.setPosition(self.to_document(self.buffer.line_start(number)))
+            self.setTextCursor(cursor)
+            self.centerCursor()
+
+    def replace_all(self, pattern, replacer):
+        # 문서 전체에서 pattern 을 바꿈. 반환값: 바꾼 개수
+        # 일치 항목마다 커서로 고치면 그때마다 레이아웃/강조/줄 번호가 다시 돌므로,
+        # 스냅샷에서 첫 일치~마지막 일치 구간의 새 텍스트를 한 번에 만들어 한 번만 바꿔 넣음
+        # (편집 블록 하나라서 실행 취소도 한 번)
+        # 파일에서 바꾸기와 같은 replace_text 를 써서 미리 본 개수와 바꾼 결과가 같게 함
+        import pyEditor_findfiles
+        text = self.buffer.snapshot().text()
+        new_text, spans = pyEditor_findfiles.replace_text(text, pattern, replacer)
+        if not spans:
+            return 0
+        first, last = spans[0][0], spans[-1][1]
+        count = len(spans)
+
+        # 바꾼 뒤에도 커서가 같은 줄 근처에 있도록 줄/열을 기억해 둠
+        old_cursor = self.textCursor()
+        line, column = old_cursor.blockNumber(), old_cursor.positionInBlock()
+
+        cursor = QTextCursor(self.document())
+        self.history.begin_group()
+        cursor.beginEditBlock()
+        cursor.setPosition(self.to_document(first))
+        cursor.setPosition(self.to_document(last), QTextCursor.KeepAnchor)
+        cursor.insertText(new_text[first:len(new_text) - (len(text) - last)])
+        cursor.endEditBlock()
+        self.history.end_group()
+
+        block = self.document().findBlockByNumber(line)
+        if block.isValid():
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + min(column, block.length() - 1))
+            self.setTextCursor(cursor)
+        return count
+
+
+class PythonHighlighter(QSyntaxHighlighter):
+    def __init__(self, document):
+        super().__init__(document)
+
+        # 토큰 종류별 포맷은 한 번만 만들어서 재사용
+        self.formats = {
+            pyEditor_tokenizer.KEYWORD: self.make_format("blue"),     # Python 키워드는 파란색으로 강조
+            pyEditor_tokenizer.OPERATOR: self.make_format("green"),   # Python 연산자는 녹색으로 강조
+            pyEditor_tokenizer.STRING: self.make_format("darkRed"),   # 문자열은 진한 빨간색으로 강조
+            pyEditor_tokenizer.COMMENT: self.make_format("gray"),     # 주석은 회색으로 강조
+        }
+
+    @staticmethod
+    def make_format(color):
+        text_format = QTextCharFormat()
+        text_format.setForeground(QColor(color))
+        return text_format
+
+    def highlightBlock(self, text):
+        # Qt 가 변경된 블록과, 상태가 바뀐 다음 블록들에 대해서만 호출함
+        state = max(self.previousBlockState(), pyEditor_tokenizer.STATE_NORMAL)
+        runs, state = pyEditor_tokenizer.tokenize_line(text, state)
+
+        # runs 는 코드 포인트 단위, setFormat 은 UTF-16 단위 - BMP 밖 문자가 있는 줄만 앞쪽 개수만큼 밀어 줌
+        formats = self.formats
+        astral = [] if text.isascii() else [match.start() for match in ASTRAL_RE.finditer(text)]
+        for start, length, kind in runs:
+            if astral:
+                first = bisect_left(astral, start)
+                last = bisect_left(astral, start + length)
+                start, length = start + first, length + last - first
+            self.setFormat(start, length, formats[kind])
+
+        self.setCurrentBlockState(state)
+
+
+class LargeFileViewer(QAbstractScrollArea):
+    # 큰 파일용 읽기 전용 뷰어 - QTextDocument 없이 LineIndex 에서 보이는 줄만 읽어 그림
+    cursorPositionChanged = pyqtSignal()
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.current_line = 0
+        self.current_column = 0
+        self.find_offset = 0
+        self.max_columns = 0
+        self.search_worker = None
+
+        self.setFont(QFont("Arial", 10))
+        self.viewport().setStyleSheet("background-color: white;")
+
+        # 색인은 타이머로 조금씩 만들어서 GUI 가 멈추지 않게 함
+        self.index_timer = QTimer(self)
+        self.index_timer.timeout.connect(self.build_index_step)
+        self.index_timer.start(0)
+
+    def close_index(self):
+        self.index_timer.stop()
+        self.stop_search()
+        self.index.close()
+
+    def build_index_step(self):
+        if self.index.build_step():
+            self.index_timer.stop()
+        self.update_scrollbars()
+        self.viewport().update()
+        self.cursorPositionChanged.emit()
+
+    def isReadOnly(self):
+        return True
+
+    def line_height(self):
+        return self.fontMetrics().height()
+
+    def visible_rows(self):
+        return max(1, self.viewport().height() // self.line_height())
+
+    def gutter_width(self):
+        return 10 + self.fontMetrics().horizontalAdvance('9') * max(8, len(str(self.index.line_count())))
+
+    def update_scrollbars(self):
+        rows = self.visible_rows()
+        self.verticalScrollBar().setRange(0, max(0, self.index.line_count() - rows))
+        self.verticalScrollBar().setPageStep(rows)
+
+        char_width = self.fontMetrics().horizontalAdvance('9')
+        text_width = self.viewport().width() - self.gutter_width()
+        self.horizontalScrollBar().setRange(0, max(0, self.max_columns * char_width - text_width))
+        self.horizontalScrollBar().setPageStep(max(1, text_width))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+
+    def setFont(self, font):
+        super().setFont(font)
+        self.update_scrollbars()
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = event.rect()
+        painter.fillRect(rect, Qt.white)
+
+        line_height = self.line_height()
+        ascent = self.fontMetrics().ascent()
+        gutter = self.gutter_width()
+        x = gutter + 4 - self.horizontalScrollBar().value()
+
+        first = self.verticalScrollBar().value() + rect.top() // line_height
+        last = min(self.index.line_count(), self.verticalScrollBar().value() + rect.bottom() // line_height + 1)
+
+        painter.fillRect(0, rect.top(), gutter, rect.height(), Qt.lightGray)
+        painter.setFont(self.font())
+
+        for number in range(first, last):
+            y = (number - self.verticalScrollBar().value()) * line_height
+            text = self.index.line(number)
+            self.max_columns = max(self.max_columns, len(text))
+
+            if number == self.current_line:
+                painter.fillRect(gutter, y, self.viewport().width() - gutter, line_height, QColor(192, 192, 192, 80))
+
+            painter.setPen(Qt.black)
+            painter.drawText(0, y, gutter - 5, line_height, Qt.AlignRight, str(number + 1))
+            painter.setClipRect(gutter, y, self.viewport().width() - gutter, line_height)
+            painter.drawText(x, y + ascent, text)
+            painter.setClipping(False)
+
+    def go_to_line(self, number):
+        self.current_line = max(0, min(number, self.index.line_count() - 1))
+        self.current_column = 0
+        self.find_offset = self.index.offsets[self.current_line] if self.index.line_count() else 0
+        self.ensureCursorVisible()
+
+    def ensureCursorVisible(self):
+        bar = self.verticalScrollBar()
+        rows = self.visible_rows()
+        if not bar.value() <= self.current_line < bar.value() + rows:
+            bar.setValue(self.current_line - rows // 2)
+        self.viewport().update()
+        self.cursorPositionChanged.emit()
+
+    def search(self, text, counting, done):
+        # 색인(mmap) 에서 작업 스레드로 찾음 - 파일 내용을 문자열로 만들지 않음
+        # 찾기는 현재 위치 뒤부터 끝까지, 없으면 처음부터 현재 위치까지 찾고 done(바이트 위치, 없으면 -1) 을 부름
+        # 세기는 색인이 끝난 범위 전체를 세고 done(개수) 를 부름
+        self.stop_search()
+        indexed = self.index.indexed
+        if counting:
+            ranges = [(0, indexed)]
+        else:
+            overlap = len(text.encode(self.index.encoding)) - 1
+            ranges = [(self.find_offset, indexed), (0, min(indexed, self.find_offset + overlap))]
+
+        worker = ViewerSearchWorker(self.index, text, ranges, counting, self)
+        worker.done.connect(lambda result: self.search_finished(worker, result, counting, done))
+        worker.finished.connect(worker.deleteLater)
+        self.search_worker = worker
+        worker.start()
+
+    def stop_search(self):
+        if self.search_worker is not None:
+            worker = self.search_worker
+            self.search_worker = None
+            worker.cancel()
+            worker.wait()
+
+    def search_finished(self, worker, result, counting, done):
+        if worker is not self.search_worker:
+            return
+        self.search_worker = None
+        if not counting and result >= 0:
+            self.current_line, self.current_column = self.index.position_of(result)
+            self.find_offset = result + 1
+            self.ensureCursorVisible()
+        done(result)
+
+    def mousePressEvent(self, event):
+        number = self.verticalScrollBar().value() + event.pos().y() // self.line_height()
+        if number < self.index.line_count():
+            self.go_to_line(number)
+
+    def keyPressEvent(self, event):
+        moves = {
+            Qt.Key_Up: -1, Qt.Key_Down: 1,
+            Qt.Key_PageUp: -self.visible_rows(), Qt.Key_PageDown: self.visible_rows(),
+        }
+        if event.key() in moves:
+            self.go_to_line(self.current_line + moves[event.key()])
+        elif event.key() == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+            self.go_to_line(0)
+        elif event.key() == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+            self.go_to_line(self.index.line_count() - 1)
+        else:
+            super().keyPressEvent(event)
+
+    def copy(self):
+        # 읽기 전용이므로 현재 줄만 복사
+        if self.index.line_count():
+            QApplication.clipboard().setText(self.index.line(self.current_line))
+
+    def cut(self):
+        pass
+
+    def paste(self):
+        pass
+
+
+class ViewerSearchWorker(QThread):
+    # 큰 파일 뷰어의 찾기/세기 - ranges 를 차례로 훑어서 찾은 바이트 위치(없으면 -1) 나 개수를 보냄
+    done = pyqtSignal(object)
+
+    def __init__(self, index, text, ranges, counting, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.text = text
+        self.ranges = ranges
+        self.counting = counting
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        count = 0
+        for start, end in self.ranges:
+            for found in self.index.find_all(self.text, start, end):
+                if self.isInterruptionRequested():
+                    return
+                if not self.counting and found:
+                    self.done.emit(found[0])
+                    return
+                count += len(found)
+        self.done.emit(count if self.counting else -1)
+
+
+class FileLoader(QThread):
+    # 작업 스레드에서 파일을 조각 단위로 읽고 디코딩해서 GUI 로 넘겨줌
+    chunk_loaded = pyqtSignal(str)
+    progress = pyqtSignal(int, int)     # 읽은 바이트, 전체 바이트
+    loaded = pyqtSignal(str)            # 파일에서 처음 만난 줄바꿈 문자
+    failed = pyqtSignal(str)
+
+    FIRST_CHUNK_SIZE = 64 * 1024        # 첫 화면은 작은 조각으로 빨리 보여줌
+    CHUNK_SIZE = 1024 * 1024
+    MAX_PENDING_CHUNKS = 4              # GUI 가 아직 붙이지 못한 조각 수 제한
+    APPEND_SLICE = 16 * 1024            # GUI 가 한 번에 붙이는 글자 수 (줄 단위로 자름)
+    APPEND_SECONDS = 0.016              # GUI 가 이벤트 루프 한 바퀴에 붙이는 데 쓰는 시간
+
+    def __init__(self, path, encoding='utf-8', parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.encoding = encoding
+        self.pending = threading.Semaphore(self.MAX_PENDING_CHUNKS)
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def chunk_done(self):
+        # GUI 가 조각 하나를 문서에 붙였을 때 호출
+        self.pending.release()
+
+    def emit_chunk(self, text):
+        while not self.pending.acquire(timeout=0.1):
+            if self.isInterruptionRequested():
+                return False
+        self.chunk_loaded.emit(text)
+        return True
+
+    def wait_appended(self):
+        # GUI 는 조각을 나눠서 붙이므로, 넘긴 조각이 모두 붙은 다음에 loaded 를 보냄
+        for _ in range(self.MAX_PENDING_CHUNKS):
+            while not self.pending.acquire(timeout=0.1):
+                if self.isInterruptionRequested():
+                    return False
+        return True
+
+    def run(self):
         try:
-            index = text.index("#", 0)
-            while index >= 0:
-                cursor.setPosition(block.position() + index)
-                cursor.movePosition(QTextCursor.EndOfLine, QTextCursor.KeepAnchor)
-                format = QTextCharFormat()
-                format.setForeground(QColor("gray"))  # 주석은 회색으로 강조
-                cursor.setCharFormat(format)
-                index = text.index("#", index + 1)
-        except ValueError:
-            pass  # 주석을 찾지 못할 경우 예외 처리
+            total = os.path.getsize(self.path)
+            # \r\n 이 조각 경계에서 나뉘어도 줄바꿈을 올바르게 바꿔 줌
+            decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(self.encoding)(), translate=True)
+            done = 0
+            size = self.FIRST_CHUNK_SIZE
+
+            with open(self.path, 'rb') as file:
+                while not self.isInterruptionRequested():
+                    data = file.read(size)
+                    if not data:
+                        break
+                    done += len(data)
+                    text = decoder.decode(data)
+                    if text and not self.emit_chunk(text):
+                        return
+                    self.progress.emit(done, total)
+                    size = self.CHUNK_SIZE
+
+            if self.isInterruptionRequested():
+                return
+
+            text = decoder.decode(b'', final=True)
+            if text and not self.emit_chunk(text):
+                return
+        except (OSError, LookupError, UnicodeDecodeError) as e:
+            self.failed.emit(str(e))
+            return
+
+        # 저장할 때 원래 줄바꿈을 되살리기 위해 알려줌 (섞여 있으면 \r\n 우선)
+        newlines = decoder.newlines or '\n'
+        if isinstance(newlines, tuple):
+            newlines = '\r\n' if '\r\n' in newlines else newlines[0]
+        if self.wait_appended():
+            self.loaded.emit(newlines)
+
+
+class SpillLoader(FileLoader):
+    # 잠든 탭을 깨울 때 - 압축해서 옮겨 둔 텍스트를 풀어서 파일과 같은 방식으로 조각씩 넘겨줌
+    def __init__(self, spill, newline, parent=None):
+        super().__init__(None, 'utf-8', parent)
+        self.spill = spill
+        self.newline = newline
+
+    def run(self):
+        try:
+            total = os.fstat(self.spill.fileno()).st_size
+            for done, text in pyEditor_fileio.read_spill(self.spill, self.FIRST_CHUNK_SIZE, self.CHUNK_SIZE):
+                if self.isInterruptionRequested() or not self.emit_chunk(text):
+                    return
+                self.progress.emit(done, total)
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        if self.wait_appended():
+            self.loaded.emit(self.newline)
+
+
+class FindInFilesWorker(QThread):
+    # 프로세스 풀을 돌리는 스레드 - 파일 하나가 끝날 때마다 결과를 GUI 로 보냄
+    file_matched = pyqtSignal(str, list)
+    progress = pyqtSignal(int)          # 지금까지 훑은 파일 수
+    failed = pyqtSignal(str)
+
+    INDEX_MAX_AGE = 60                  # 색인한 지 이 시간(초)이 안 지났으면 폴더 전체를 다시 훑지 않음
+
+    def __init__(self, root, query, options, extensions, skip_dirs, use_index=False, written=(), parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.query = query
+        self.options = options          # (regex, case_sensitive, whole_word)
+        self.extensions = extensions
+        self.skip_dirs = skip_dirs
+        self.use_index = use_index      # 디스크 색인(pyEditor_codeindex)으로 후보 파일만 찾음
+        self.written = list(written)    # 편집기가 쓴 파일 - 전체를 훑지 않을 때도 색인에 반영
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        if self.use_index:
+            self.run_indexed()
+            return
+
+        import pyEditor_findfiles
+        scanned = 0
+        try:
+            for path, matches in pyEditor_findfiles.find_in_files(self.root, self.query, *self.options,
+                                                                  extensions=self.extensions,
+                                                                  cancelled=self.isInterruptionRequested,
+                                                                  skip_dirs=self.skip_dirs):
+                if path is None:
+                    scanned += matches
+                    self.progress.emit(scanned)
+                else:
+                    self.file_matched.emit(path, matches)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def run_indexed(self):
+        # sqlite 연결은 만든 스레드에서만 쓸 수 있으므로 여기서 열고 닫음
+        import pyEditor_codeindex
+        try:
+            index = pyEditor_codeindex.CodeIndex(self.root)
+            try:
+                index.update(max_age=self.INDEX_MAX_AGE, skip_dirs=self.skip_dirs)
+                index.refresh(self.written, self.skip_dirs)
+                for path, matches in index.search(self.query, *self.options, extensions=self.extensions,
+                                                  cancelled=self.isInterruptionRequested):
+                    if self.isInterruptionRequested():
+                        return
+                    self.file_matched.emit(path, matches)
+            finally:
+                index.close()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class ReplaceInFilesWorker(QThread):
+    # 바꾸기 미리 보기 / 적용을 프로세스 풀에서 돌리는 스레드
+    #   items 가 None 이면 root 아래 파일로 미리 보기, 있으면 그 파일들에 실제로 씀
+    previewed = pyqtSignal(list, list)  # [(path, mtime_ns, size, 개수, 바뀌는 줄 목록), ...], [(건너뛴 path, 이유), ...]
+    applied = pyqtSignal(list)          # [(path, 개수, 오류), ...]
+    progress = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, root, query, replacement, options, extensions, skip_dirs, items=None, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.args = (query, replacement, *options)
+        self.extensions = extensions
+        self.skip_dirs = skip_dirs
+        self.items = items
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        import pyEditor_findfiles
+        done = 0
+        try:
+            if self.items is None:
+                paths = pyEditor_findfiles.walk_files(self.root, self.extensions, self.skip_dirs)
+                function = pyEditor_findfiles.preview_files
+            else:
+                paths = self.items
+                function = pyEditor_findfiles.apply_files
+
+            # 마지막 묶음은 BATCH_SIZE 보다 작으므로 묶음마다 실제로 처리한 파일 수를 더함
+            for output in pyEditor_findfiles.run_batches(function, paths, self.args,
+                                                         cancelled=self.isInterruptionRequested):
+                done += output[-1]
+                if self.items is None:
+                    results, skipped, _ = output
+                    if results or skipped:
+                        self.previewed.emit(results, skipped)
+                elif output[0]:
+                    self.applied.emit(output[0])
+                self.progress.emit(done)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class ReplacePreviewModel(QAbstractListModel):
+    # 바꾸기 미리 보기 목록 - 줄 정보는 튜플로만 갖고 있고 보이는 행의 글자만 그때 만듦
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.files = []     # [(path, mtime_ns, size, 개수), ...]
+        self.skipped = []   # [(path, 이유), ...] - 읽지 못해서 바꾸지 않는 파일
+        self.rows = []      # [(파일 번호, 줄 번호, 원래 줄, 바뀐 줄), ...] (건너뛴 파일은 (skipped 번호, None, 이유, None))
+
+    def clear(self):
+        self.beginResetModel()
+        self.files = []
+        self.skipped = []
+        self.rows = []
+        self.endResetModel()
+
+    def add_files(self, results, skipped=()):
+        rows = []
+        for path, reason in skipped:
+            rows.append((len(self.skipped), None, reason, None))
+            self.skipped.append((path, reason))
+        for path, mtime, size, count, changes in results:
+            file_index = len(self.files)
+            self.files.append((path, mtime, size, count))
+            rows.extend((file_index, line, old, new) for line, old, new in changes)
+
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        file_index, line, old, new = self.rows[index.row()]
+        path = self.files[file_index][0] if line is not None else self.skipped[file_index][0]
+        if role == Qt.DisplayRole:
+            if line is None:
+                return f'{path}:  {old}'
+            # 줄을 넘는 바꾸기는 줄바꿈을 ⏎ 로 보여 줌
+            old = old.strip().replace('\r', '').replace('\n', '⏎')
+            new = new.strip().replace('\r', '').replace('\n', '⏎')
+            return f'{path}:{line + 1}:  {old}  →  {new}'
+        if role == Qt.UserRole:
+            return path, line
+        return None
+
+    def replace_count(self):
+        return sum(file[3] for file in self.files)
+
+
+class FindInFilesPanel(QDockWidget):
+    def __init__(self, parent=None):
+        super().__init__('파일에서 찾기', parent)
+        self.editor = parent
+        self.worker = None
+        self.replace_worker = None
+        self.match_count = 0
+        self.replaced = 0
+        self.busy = 0          # 저장하지 않은 수정이 있는 잠든 탭에 열려 있어서 건너뛴 파일 수
+        self.error = None
+
+        self.dir_edit = QLineEdit(os.getcwd())
+        self.browse_button = QPushButton('...')
+        self.browse_button.clicked.connect(self.choose_directory)
+        self.query_edit = QLineEdit()
+        self.query_edit.returnPressed.connect(self.start_search)
+        self.ext_edit = QLineEdit()
+        self.ext_edit.setPlaceholderText('확장자 (예: .py .txt, 비우면 모든 파일)')
+        import pyEditor_findfiles
+        self.skip_edit = QLineEdit(' '.join(sorted(pyEditor_findfiles.SKIP_DIRS)))
+        self.skip_edit.setPlaceholderText('건너뛸 폴더 이름 (. 으로 시작하는 폴더는 항상 건너뜀)')
+        self.regex_check = QCheckBox('정규식')
+        self.case_check = QCheckBox('대소문자 구분')
+        self.word_check = QCheckBox('단어 단위')
+        self.index_check = QCheckBox('색인 사용')
+        self.search_button = QPushButton('찾기')
+        self.search_button.clicked.connect(self.start_search)
+        self.stop_button = QPushButton('중지')
+        self.stop_button.clicked.connect(self.stop_search)
+        self.status_label = QLabel('')
+
+        self.replace_edit = QLineEdit()
+        self.preview_button = QPushButton('바꾸기 미리 보기')
+        self.preview_button.clicked.connect(self.start_preview)
+        self.apply_button = QPushButton('모두 바꾸기')
+        self.apply_button.setEnabled(False)
+        self.apply_button.clicked.connect(self.apply_replace)
+
+        self.results = QTreeWidget()
+        self.results.setHeaderLabels(['파일 / 줄', '내용'])
+        self.results.itemClicked.connect(self.open_result)
+
+        # 미리 보기는 줄이 수만 개가 될 수 있어서 모델/뷰로 보이는 행만 그림
+        self.preview_model = ReplacePreviewModel(self)
+        self.preview = QListView()
+        self.preview.setModel(self.preview_model)
+        self.preview.setUniformItemSizes(True)
+        self.preview.clicked.connect(self.open_preview)
+        self.preview.hide()
+
+        dir_box = QHBoxLayout()
+        dir_box.addWidget(QLabel('폴더:'))
+        dir_box.addWidget(self.dir_edit)
+        dir_box.addWidget(self.browse_button)
+        dir_box.addWidget(QLabel('건너뛸 폴더:'))
+        dir_box.addWidget(self.skip_edit)
+
+        query_box = QHBoxLayout()
+        query_box.addWidget(QLabel('찾을 내용:'))
+        query_box.addWidget(self.query_edit)
+        query_box.addWidget(self.ext_edit)
+
+        replace_box = QHBoxLayout()
+        replace_box.addWidget(QLabel('바꿀 내용:'))
+        replace_box.addWidget(self.replace_edit)
+        replace_box.addWidget(self.preview_button)
+        replace_box.addWidget(self.apply_button)
+
+        option_box = QHBoxLayout()
+        option_box.addWidget(self.regex_check)
+        option_box.addWidget(self.case_check)
+        option_box.addWidget(self.word_check)
+        option_box.addWidget(self.index_check)
+        option_box.addWidget(self.search_button)
+        option_box.addWidget(self.stop_button)
+        option_box.addWidget(self.status_label)
+
+        layout = QVBoxLayout()
+        layout.addLayout(dir_box)
+        layout.addLayout(query_box)
+        layout.addLayout(replace_box)
+        layout.addLayout(option_box)
+        layout.addWidget(self.results)
+        layout.addWidget(self.preview)
+
+        widget = QWidget()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+    def choose_directory(self):
+        directory = QFileDialog.getExistingDirectory(self, '폴더 선택', self.dir_edit.text())
+        if directory:
+            self.dir_edit.setText(directory)
+
+    def options(self):
+        return (self.regex_check.isChecked(), self.case_check.isChecked(), self.word_check.isChecked())
+
+    def extensions(self):
+        return [ext if ext.startswith('.') else '.' + ext for ext in self.ext_edit.text().split()]
+
+    def skip_dirs(self):
+        return set(self.skip_edit.text().split())
+
+    def check_query(self):
+        # 폴더/찾을 내용을 확인하고 정규식 오류는 프로세스로 넘기기 전에 여기서 알림
+        root = self.dir_edit.text()
+        query = self.query_edit.text()
+        if not query or not os.path.isdir(root):
+            self.status_label.setText('폴더와 찾을 내용을 확인하세요.')
+            return False
+
+        try:
+            pyEditor_search.compile_query(query, *self.options())
+        except re.error as e:
+            self.status_label.setText(f'잘못된 정규식: {e}')
+            return False
+        return True
+
+    def start_search(self):
+        self.stop_search()
+        self.results.clear()
+        self.results.show()
+        self.preview.hide()
+        self.apply_button.setEnabled(False)
+        self.match_count = 0
+        self.error = None
+
+        if not self.check_query():
+            return
+        root = self.dir_edit.text()
+        query = self.query_edit.text()
+        extensions = self.extensions()
+
+        worker = FindInFilesWorker(root, query, self.options(), extensions, self.skip_dirs(),
+                                   self.index_check.isChecked(), self.editor.written_paths, self)
+        worker.file_matched.connect(self.add_file_result)
+        worker.progress.connect(lambda scanned: self.status_label.setText(
+            f'{scanned}개 파일 훑음, {self.match_count}개 찾음...'))
+        worker.failed.connect(lambda message: setattr(self, 'error', message))
+        worker.finished.connect(lambda: self.search_finished(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.worker = worker
+        self.status_label.setText('찾는 중...')
+        worker.start()
+
+    def stop_search(self):
+        if self.worker is not None:
+            worker = self.worker
+            self.worker = None
+            worker.cancel()
+            worker.wait()
+            self.status_label.setText(f'중지됨, {self.match_count}개 찾음')
+        if self.replace_worker is not None:
+            worker = self.replace_worker
+            self.replace_worker = None
+            worker.cancel()
+            worker.wait()
+            self.status_label.setText('중지됨')
+
+    def search_finished(self, worker):
+        if worker is self.worker:
+            self.worker = None
+            if self.error is not None:
+                self.status_label.setText(f'오류: {self.error}')
+            else:
+                self.status_label.setText(f'{self.match_count}개 찾음 ({self.results.topLevelItemCount()}개 파일)')
+
+    def add_file_result(self, path, matches):
+        file_item = QTreeWidgetItem([path, f'{len(matches)}개'])
+        file_item.setData(0, Qt.UserRole, (path, 0))
+        for line, column, text in matches:
+            item = QTreeWidgetItem(file_item, [str(line + 1), text.strip()])
+            item.setData(0, Qt.UserRole, (path, line))
+        self.results.addTopLevelItem(file_item)
+        self.match_count += len(matches)
+
+    def open_result(self, item, column):
+        path, line = item.data(0, Qt.UserRole)
+        self.editor.open_file_at(path, line)
+
+    def open_preview(self, index):
+        path, line = index.data(Qt.UserRole)
+        self.editor.open_file_at(path, line)
+
+    def start_replace_worker(self, items=None):
+        worker = ReplaceInFilesWorker(self.dir_edit.text(), self.query_edit.text(), self.replace_edit.text(),
+                                      self.options(), self.extensions(), self.skip_dirs(), items, self)
+        worker.failed.connect(lambda message: setattr(self, 'error', message))
+        worker.finished.connect(lambda: self.replace_finished(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.replace_worker = worker
+        return worker
+
+    def start_preview(self):
+        self.stop_search()
+        self.preview_model.clear()
+        self.results.hide()
+        self.preview.show()
+        self.apply_button.setEnabled(False)
+        self.error = None
+
+        if not self.check_query():
+            return
+
+        worker = self.start_replace_worker()
+        worker.previewed.connect(self.preview_model.add_files)
+        worker.progress.connect(lambda scanned: self.status_label.setText(
+            f'{scanned}개 파일 훑음, {self.preview_model.replace_count()}개 바뀜...'))
+        self.status_label.setText('미리 보는 중...')
+        worker.start()
+
+    def apply_replace(self):
+        # 열려 있는 탭은 문서 안에서 바로 바꾸고, 나머지 파일은 프로세스 풀에서 임시 파일로 써서 바꿔치기
+        self.stop_search()
+        self.apply_button.setEnabled(False)
+        self.error = None
+
+        import pyEditor_findfiles
+        pattern = pyEditor_search.compile_query(self.query_edit.text(), *self.options())
+        replacer = pyEditor_findfiles.make_replacer(self.replace_edit.text(), self.regex_check.isChecked())
+        open_states = self.editor.open_states()
+        busy_paths = self.editor.busy_paths()
+
+        items = []
+        self.replaced = 0
+        self.busy = 0
+        for path, mtime, size, count in self.preview_model.files:
+            state = open_states.get(os.path.abspath(path))
+            if os.path.abspath(path) in busy_paths:
+                self.busy += 1
+            elif state is None:
+                items.append((path, mtime, size))
+            else:
+                self.replaced += self.editor.replace_in_tab(state, pattern, replacer)
+
+        worker = self.start_replace_worker(items)
+        worker.applied.connect(self.add_applied)
+        self.status_label.setText('바꾸는 중...')
+        worker.start()
+
+    def add_applied(self, results):
+        for path, count, error in results:
+            self.replaced += count
+            if count and error is None:
+                self.editor.written_paths.add(os.path.abspath(path))
+            if error is not None:
+                self.error = f'{path}: {error}'
+
+    def replace_finished(self, worker):
+        if worker is not self.replace_worker:
+            return
+        self.replace_worker = None
+        applying = worker.items is not None
+
+        if self.error is not None:
+            self.status_label.setText(f'오류: {self.error}')
+        elif applying:
+            busy = f', 저장하지 않은 수정이 있는 탭에 열린 파일 {self.busy}개는 건너뜀' if self.busy else ''
+            self.status_label.setText(f'{self.replaced}개 바꿈{busy}')
+        else:
+            model = self.preview_model
+            skipped = f', {len(model.skipped)}개 파일은 읽지 못해 건너뜀' if model.skipped else ''
+            self.status_label.setText(f'{model.replace_count()}개 바뀜 ({len(model.files)}개 파일{skipped})')
+        self.apply_button.setEnabled(not applying and bool(self.preview_model.files))
+
+
+class InstanceServer(QObject):
+    # 나중에 실행된 pyEditor 가 보낸 파일 목록을 받음 (보내는 쪽은 pyEditor_instance.send_files)
+    files_received = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+        self.buffers = {}           # 연결된 소켓 -> 지금까지 받은 내용
+
+    def listen(self):
+        name = pyEditor_instance.server_name()
+        if name is None:
+            logging.warning('한 번만 실행 모드를 쓸 수 없음: 소켓을 둘 안전한 디렉터리가 없음')
+            return False
+        if self.server.listen(name):
+            return True
+        # 지난번에 비정상 종료하면서 남은 소켓 파일만 지움
+        # (떠 있는 편집기가 바빠서 답하지 못했거나 동시에 뜨는 중이면 그 소켓을 지우면 안 됨)
+        if pyEditor_instance.is_stale_socket(name):
+            QLocalServer.removeServer(name)
+            if self.server.listen(name):
+                return True
+        logging.warning(f'한 번만 실행 모드를 쓸 수 없음: {self.server.errorString()}')
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = bytearray()
+            socket.readyRead.connect(self.read_message)
+            socket.disconnected.connect(self.drop_client)
+            # 연결을 받기 전에 이미 도착한 내용은 readyRead 가 다시 오지 않음
+            if socket.bytesAvailable():
+                self.read_message(socket)
+
+    def drop_client(self):
+        socket = self.sender()
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def read_message(self, socket=None):
+        socket = socket or self.sender()
+        buffer = self.buffers.get(socket)
+        if buffer is None:
+            return
+        buffer += bytes(socket.readAll())
+        end = pyEditor_instance.message_end(buffer)
+        if end < 0:
+            if len(buffer) > pyEditor_instance.MAX_MESSAGE_SIZE:
+                socket.abort()
+            return
+
+        files = pyEditor_instance.decode_message(bytes(buffer[:end]))
+        del self.buffers[socket]
+        socket.write(b'ok\n')
+        socket.flush()
+        socket.disconnectFromServer()
+        self.files_received.emit(files)
+
+
+class StartupProbe(QObject):
+    # 시작 시간 측정 - 편집 영역을 처음 그린 시각까지 기록해서 파일에 쓰고 창을 닫음
+    # (pyEditor_startup.py 가 PYEDITOR_STARTUP_REPORT 환경 변수로 파일 경로를 넘겨서 켬)
+    def __init__(self, editor, path, app_created):
+        super().__init__(editor)
+        self.editor = editor
+        self.path = path
+        self.marks = {'imported': imported_at, 'app': app_created, 'window': time.time()}
+        editor.text_area.viewport().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and 'painted' not in self.marks:
+            self.marks['painted'] = time.time()
+            QTimer.singleShot(0, self.finish)
+        return False
+
+    def finish(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.marks, f)
+        self.editor.close()
+
+
+class TabState:
+    # 탭 하나의 상태 (탭 위젯을 키로 TextEditor.tab_states 에 보관)
+    __slots__ = ('editor', 'gutter', 'path', 'encoding', 'newline', 'dirty', 'loader', 'pending_line', 'tab_id',
+                 'restore', 'last_used', 'fingerprint', 'spill', 'history', 'slices')
+    next_id = 0
+
+    def __init__(self, editor, gutter, path=None, encoding='utf-8'):
+        self.editor = editor
+        self.gutter = gutter
+        self.path = path
+        self.encoding = encoding
+        self.newline = '\n'
+        self.dirty = False
+        self.loader = None
+        self.pending_line = None    # 불러오기가 끝나면 이동할 줄
+        self.slices = deque()       # 불러온 조각 중 아직 붙이지 못한 부분 (텍스트, 조각의 끝인지)
+        TabState.next_id += 1
+        self.tab_id = TabState.next_id    # 자동 저장 기록에서 탭을 구분하는 번호
+        self.restore = None         # 세션에서 되살린 (줄, 열, 스크롤) - 불러오기가 끝나면 적용
+        self.last_used = 0.0        # 마지막으로 이 탭을 본 시각 (오래된 탭부터 잠재움)
+
+        # 잠든 탭: 디스크와 같던 탭은 파일 (mtime_ns, 크기) 만, 수정된 탭은 압축한 텍스트와 실행 취소 기록
+        self.fingerprint = None
+        self.spill = None
+        self.history = None
 
 
 class TextEditor(QMainWindow):
+    # 이 크기 이상인 파일은 읽기 전용 뷰어로 엶
+    large_file_threshold = 64 * 1024 * 1024
+
+    # 편집기들이 쓰는 메모리가 이만큼을 넘으면 오래 안 본 탭부터 편집기를 내려놓고 잠재움
+    # (문서 + piece table + 찾기 색인 + 강조 서식을 글자/블록 수로 어림함)
+    memory_budget = 512 * 1024 * 1024
+    memory_per_char = 24
+    memory_per_block = 256
+
+    # 종료할 때 열린 파일 탭 목록을 저장해 두었다가 다음 실행 때 되살림
+    session_path = os.path.join(os.path.expanduser('~'), '.cache', 'pyEditor', 'session.json')
+
     def __init__(self):
         super().__init__()
+        self.tab_states = {}
+
+        # 상태 표시줄/줄 번호 갱신을 이벤트 루프 한 바퀴에 한 번으로 모음
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(0)
+        self.update_timer.timeout.connect(self.update_line_numbers)
+        self.restoring = False      # 세션 탭을 추가하는 동안에는 탭 전환으로 편집기를 만들지 않음
+
+        # 잠재울 탭 고르기는 모든 탭의 메모리를 훑으므로, 탭을 바꿀 때마다 하지 않고 잠시 뒤 한 번만 함
+        self.hibernate_timer = QTimer(self)
+        self.hibernate_timer.setSingleShot(True)
+        self.hibernate_timer.setInterval(500)
+        self.hibernate_timer.timeout.connect(self.hibernate_tabs)
+
+        # 이 편집기가 디스크에 쓴 파일 - 파일에서 찾기 색인이 폴더 전체를 다시 훑지 않을 때도 다시 읽게 함
+        self.written_paths = set()
+
+        # 불러온 조각은 한 번에 붙이지 않고 이벤트 루프 한 바퀴마다 APPEND_SECONDS 만큼만 붙임
+        # (1MB 를 한 번에 붙이면 강조 표시까지 0.3초 넘게 화면이 멈춤)
+        self.appending = []         # 붙일 조각이 남은 탭
+        self.append_timer = QTimer(self)
+        self.append_timer.setInterval(0)
+        self.append_timer.timeout.connect(self.append_step)
+
+        # 저장하지 않은 탭의 편집 기록 - 비정상 종료 후 다음 실행 때 되살림
+        try:
+            self.journal = pyEditor_journal.Journal()
+        except OSError:
+            self.journal = None
+        self.journal_rebase = set()     # 기록 파일을 다시 시작해서 깨운 뒤 기준을 다시 써야 하는 탭 번호
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.setInterval(30 * 1000)
+        self.checkpoint_timer.timeout.connect(self.checkpoint_journal)
+        self.checkpoint_timer.start()
+
         self.initUI()
+        self.restore_session()
+        QTimer.singleShot(0, self.restore_journal)
 
     def initUI(self):
         self.setWindowTitle('Text Editor by Python')
@@ -197,6 +1961,10 @@ class TextEditor(QMainWindow):
         save_as_action.setShortcut('Ctrl+Shift+S')
         save_as_action.triggered.connect(self.save_as)
 
+        cancel_open_action = QAction('열기 취소', self)
+        cancel_open_action.setShortcut('Esc')
+        cancel_open_action.triggered.connect(self.cancel_loading)
+
         close_tab_action = QAction('탭 닫기', self)
         close_tab_action.setShortcut('Ctrl+W')
         close_tab_action.triggered.connect(self.close_tab)
@@ -205,6 +1973,14 @@ class TextEditor(QMainWindow):
         exit_action.setShortcut('Ctrl+Q')
         exit_action.triggered.connect(self.close)
 
+        undo_action = QAction('실행 취소', self)
+        undo_action.setShortcut('Ctrl+Z')
+        undo_action.triggered.connect(self.undo)
+
+        redo_action = QAction('다시 실행', self)
+        redo_action.setShortcut('Ctrl+Y')
+        redo_action.triggered.connect(self.redo)
+
         cut_action = QAction('잘라내기', self)
         cut_action.setShortcut('Ctrl+X')
         cut_action.triggered.connect(self.cut)
@@ -221,47 +1997,259 @@ class TextEditor(QMainWindow):
         font_action.setShortcut('Ctrl+Shift+F')
         font_action.triggered.connect(self.choose_font)
 
+        find_in_files_action = QAction('파일에서 찾기', self)
+        find_in_files_action.setShortcut('Ctrl+Alt+F')
+        find_in_files_action.triggered.connect(self.show_find_in_files)
+
+        go_to_line_action = QAction('줄로 이동', self)
+        go_to_line_action.setShortcut('Ctrl+G')
+        go_to_line_action.triggered.connect(self.go_to_line)
+
         find_action = QAction('찾기', self)
         find_action.setShortcut('Ctrl+F')
         find_action.triggered.connect(self.show_find_dialog)
 
+        occurrence_action = QAction('같은 단어 강조', self)
+        occurrence_action.setCheckable(True)
+        occurrence_action.setChecked(MyTextEdit.highlight_occurrences)
+        occurrence_action.toggled.connect(self.set_highlight_occurrences)
+
+        trace_paint_action = QAction('페인트 추적 로그', self)
+        trace_paint_action.setCheckable(True)
+        trace_paint_action.setChecked(LineNumberArea.trace_paint)
+        trace_paint_action.toggled.connect(self.set_trace_paint)
+
         menubar = self.menuBar()
         file_menu = menubar.addMenu('파일')
         file_menu.addAction(new_action)
         file_menu.addAction(open_action)
+        file_menu.addAction(cancel_open_action)
         file_menu.addAction(save_action)
         file_menu.addAction(save_as_action)
         file_menu.addAction(close_tab_action)
         file_menu.addAction(exit_action)
 
         edit_menu = menubar.addMenu('편집')
+        edit_menu.addAction(undo_action)
+        edit_menu.addAction(redo_action)
         edit_menu.addAction(cut_action)
         edit_menu.addAction(copy_action)
         edit_menu.addAction(paste_action)
         edit_menu.addAction(find_action)
+        edit_menu.addAction(find_in_files_action)
+        edit_menu.addAction(go_to_line_action)
 
         view_menu = menubar.addMenu('보기')
         view_menu.addAction(font_action)
+        view_menu.addAction(occurrence_action)
+        view_menu.addAction(trace_paint_action)
 
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Ready")
 
+        # 도킹 패널은 처음 쓸 때 만듦 (show_find_in_files, results_panel)
+        self.find_in_files_panel = None
+        self.search_results_panel = None
+
+        # 탭 전환 시그널은 여기서 한 번만 연결
+        self.tabs.currentChanged.connect(self.update_current_tab)
+
+    def set_trace_paint(self, enabled):
+        LineNumberArea.trace_paint = enabled
+
+    def set_highlight_occurrences(self, enabled):
+        MyTextEdit.highlight_occurrences = enabled
+        for state in self.tab_states.values():
+            if isinstance(state.editor, MyTextEdit):
+                state.editor.highlight_current_line()
+
     def show_find_dialog(self):
         find_dialog = FindDialog(self)
         find_dialog.show()
 
+    def add_panel(self, panel):
+        panel.hide()
+        self.addDockWidget(Qt.BottomDockWidgetArea, panel)
+        return panel
+
+    def results_panel(self):
+        if self.search_results_panel is None:
+            self.search_results_panel = self.add_panel(SearchResultsPanel(self))
+        return self.search_results_panel
+
+    def show_find_in_files(self):
+        if self.find_in_files_panel is None:
+            self.find_in_files_panel = self.add_panel(FindInFilesPanel(self))
+        self.find_in_files_panel.show()
+        self.find_in_files_panel.query_edit.setFocus()
+
+    def open_file_at(self, file_path, line=None):
+        # 이미 열린 탭이면 그 탭으로, 아니면 새로 열고 불러오기가 끝난 뒤 줄로 이동
+        file_path = os.path.abspath(file_path)
+        for tab_widget, state in self.tab_states.items():
+            if state.path is not None and os.path.abspath(state.path) == file_path:
+                self.tabs.setCurrentWidget(tab_widget)
+                break
+        else:
+            self.load_file(file_path)
+            state = self.current_state()
+            if state is None or state.path != file_path:
+                return
+
+        if line is None:
+            return
+        if state.loader is not None:
+            state.pending_line = line
+        else:
+            state.editor.go_to_line(line)
+
+    def open_paths(self, paths):
+        # 명령행이나 나중에 실행된 pyEditor 가 넘긴 파일들을 탭으로 엶
+        missing = []
+        for path in paths:
+            if os.path.isfile(path):
+                self.open_file_at(path)
+            else:
+                missing.append(path)
+        if missing:
+            self.statusBar.showMessage(f"파일이 없습니다: {', '.join(missing)}")
+
+    def open_from_instance(self, paths):
+        self.open_paths(paths)
+        # 다른 창 뒤에 있거나 최소화되어 있으면 앞으로 가져옴
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def open_states(self):
+        # 파일 경로(절대 경로) -> 편집 가능한 탭 상태
+        return {os.path.abspath(state.path): state for state in self.tab_states.values()
+                if state.path is not None and state.editor is not None and state.loader is None
+                and not state.editor.isReadOnly()}
+
+    def busy_paths(self):
+        # 문서 안에서 바꿀 수 없고 디스크 파일을 바꿔도 안 되는 탭의 파일 (절대 경로)
+        #   저장하지 않은 수정이 있는 잠든 탭 - 나중에 저장하면 디스크에서 바꾼 내용을 덮어씀
+        #   불러오는 중인 탭 (잠든 탭을 깨우는 중인 탭 포함)
+        return {os.path.abspath(state.path) for state in self.tab_states.values()
+                if state.path is not None
+                and (state.loader is not None or (state.editor is None and state.spill is not None))}
+
+    def replace_in_tab(self, state, pattern, replacer):
+        # 열린 탭은 다시 불러오지 않고 문서 안에서 바꿈
+        # 저장하지 않은 수정이 없던 탭이면 바로 저장해서 디스크와 맞추고, 있던 탭은 수정된 채로 둠
+        dirty = state.dirty
+        count = state.editor.replace_all(pattern, replacer)
+        if count and not dirty:
+            try:
+                self.write_snapshot(state.path, state)
+                state.editor.mark_saved()
+                self.attach_journal(state)
+            except Exception as e:
+                self.statusBar.showMessage(f'{state.path} 저장 실패: {e}')
+        return count
+
+    def attach_journal(self, state, on_disk=True):
+        # 탭의 기준 상태를 기록하고 이후 편집을 기록하게 함
+        #   디스크 파일과 같으면 (경로, mtime, 크기) 만, 아니면 현재 텍스트 전체를 기준으로 씀
+        editor = state.editor
+        if self.journal is None or not isinstance(editor, MyTextEdit):
+            return
+        editor.journal = self.journal
+        editor.journal_id = state.tab_id
+
+        if on_disk and state.path is not None and not editor.document().isModified():
+            try:
+                st = os.stat(state.path)
+            except OSError:
+                pass
+            else:
+                self.journal.file_base(state.tab_id, state.path, state.encoding, state.newline,
+                                       st.st_mtime_ns, st.st_size)
+                return
+        self.journal.text_base(state.tab_id, state.path, state.encoding, state.newline, editor.buffer.snapshot(),
+                               editor.document().isModified())
+
+    def checkpoint_journal(self):
+        # 편집이 많이 쌓인 탭은 전체 텍스트를 새 기준으로 씀 (쓰기는 작업 스레드에서)
+        if self.journal is None:
+            return
+        if self.journal.error is not None:
+            self.retry_journal()
+            return
+        for state in self.tab_states.values():
+            editor = state.editor
+            if (isinstance(editor, MyTextEdit) and editor.journal is not None
+                    and self.journal.needs_checkpoint(state.tab_id)):
+                self.journal.text_base(state.tab_id, state.path, state.encoding, state.newline,
+                                       editor.buffer.snapshot(), editor.document().isModified())
+
+    def retry_journal(self):
+        # 기록을 쓰다 실패함 (디스크가 가득 참 등) - 알리고, 기록 파일을 비운 뒤 저장하지 않은 탭의 기준부터 다시 씀
+        self.statusBar.showMessage(f'자동 저장 기록을 쓰지 못했습니다: {self.journal.error} - 다시 시도합니다')
+        self.journal.restart()
+        for state in self.tab_states.values():
+            if state.spill is not None and state.loader is not None:
+                # 깨우는 중인 탭은 다 불러온 뒤 기준을 씀
+                self.journal_rebase.add(state.tab_id)
+            elif state.spill is not None:
+                # 잠든 탭은 임시 파일에 옮겨 둔 텍스트를 기준으로 씀
+                try:
+                    text = ''.join(text for done, text in pyEditor_fileio.read_spill(state.spill))
+                except (OSError, ValueError) as e:
+                    logging.warning(f'{state.path} 잠든 탭의 자동 저장 기록을 다시 쓰지 못함: {e}')
+                    continue
+                self.journal.text_base(state.tab_id, state.path, state.encoding, state.newline,
+                                       pyEditor_piecetable.PieceTable(text).snapshot(), True)
+            elif isinstance(state.editor, MyTextEdit) and state.editor.journal is not None:
+                self.attach_journal(state)
+
+    def restore_journal(self):
+        # 지난번에 비정상 종료하면서 남은 기록에서 저장하지 않은 탭을 되살림
+        try:
+            recovered = pyEditor_journal.recover()
+        except OSError:
+            return
+        for tab in recovered:
+            self.add_tab()
+            state = self.current_state()
+            state.path = tab.path
+            state.encoding = tab.encoding
+            state.newline = tab.newline
+            state.editor.journal = None
+            state.editor.setPlainText(tab.text)
+            state.editor.set_recording(True)
+            state.editor.document().setModified(True)
+            self.tabs.setTabText(self.tabs.currentIndex(), (tab.path or '새 파일') + ' (복구됨)')
+            self.attach_journal(state)
+        if recovered:
+            self.statusBar.showMessage(f'저장하지 않은 탭 {len(recovered)}개를 복구했습니다.')
+
     def add_tab(self):
-        layout = QVBoxLayout()
+        tab_widget = QWidget()
+        tab_widget.setLayout(QVBoxLayout())
+
+        state = TabState(None, None)
+        self.tab_states[tab_widget] = state
+        self.build_editor(tab_widget, state)
+        self.attach_journal(state)
 
+        self.tabs.addTab(tab_widget, '새 파일')
+        self.tabs.setCurrentWidget(tab_widget)
+
+    def build_editor(self, tab_widget, state):
+        # 탭 위젯 안에 편집기와 줄 번호 영역을 만들어 넣음
+        # (세션에서 되살린 탭은 처음 열 때까지 이걸 부르지 않음)
         self.text_area = MyTextEdit()
         font = QFont("Arial", 10)
         self.text_area.setFont(font)
 
-        self.text_area.cursorPositionChanged.connect(self.update_line_numbers)
-        self.text_area.textChanged.connect(self.update_line_numbers)
+        self.text_area.cursorPositionChanged.connect(self.schedule_update_line_numbers)
+        self.text_area.textChanged.connect(self.schedule_update_line_numbers)
 
-        self.line_number_area = LineNumberArea(self)
+        self.line_number_area = LineNumberArea(self.text_area, self)
 
         self.line_number_area.setFixedWidth(self.line_number_area_width())
         self.line_number_area.setFont(font)
@@ -273,120 +2261,649 @@ class TextEditor(QMainWindow):
         h_box.addWidget(self.line_number_area)
         h_box.addWidget(self.text_area)
 
-        layout.addLayout(h_box)
+        tab_widget.layout().addLayout(h_box)
 
-        tab_widget = QWidget()
-        tab_widget.setLayout(layout)
-        self.tabs.addTab(tab_widget, '새 파일')
-        self.tabs.setCurrentWidget(tab_widget)
-        self.tabs.currentChanged.connect(self.update_current_tab)
+        state.editor = self.text_area
+        state.gutter = self.line_number_area
+        self.text_area.modificationChanged.connect(lambda modified: setattr(state, 'dirty', modified))
+
+    def current_state(self):
+        return self.tab_states.get(self.tabs.currentWidget())
 
     def update_current_tab(self, index):
-        current_widget = self.tabs.widget(index)
+        # 레이아웃을 뒤지지 않고 탭 레지스트리에서 바로 찾음
+        tab_widget = self.tabs.widget(index)
+        state = self.tab_states.get(tab_widget)
+
+        if state is not None and state.editor is None:
+            if self.restoring:
+                return
+            self.materialize_tab(tab_widget, state)
+
+        if state is not None:
+            state.last_used = time.monotonic()
+            self.text_area = state.editor
+            self.line_number_area = state.gutter
+            self.update_line_numbers()
+            self.schedule_hibernate()
+
+    def materialize_tab(self, tab_widget, state):
+        # 자리 표시 탭이나 잠든 탭을 열 때 편집기를 만들고 파일을 불러옴
+        if state.spill is not None:
+            self.build_editor(tab_widget, state)
+            self.start_loader(state, SpillLoader(state.spill, state.newline, self))
+            return
+
+        try:
+            large = os.path.getsize(state.path) >= self.large_file_threshold
+        except OSError:
+            large = False
+
+        if large:
+            viewer = self.create_viewer(state.path, state.encoding)
+            if viewer is not None:
+                tab_widget.layout().addWidget(viewer)
+                state.editor = viewer
+                if state.restore is not None:
+                    viewer.go_to_line(state.restore[0])
+                    state.restore = None
+                return
+
+        self.build_editor(tab_widget, state)
+        self.start_loader(state)
+        if state.fingerprint is not None:
+            fingerprint, state.fingerprint = state.fingerprint, None
+            try:
+                st = os.stat(state.path)
+                changed = fingerprint != (st.st_mtime_ns, st.st_size)
+            except OSError:
+                changed = False     # 불러오기 실패로 알려 줌
+            if changed:
+                self.statusBar.showMessage(f'{state.path} 파일이 바뀌어서 다시 읽었습니다.')
+
+    def wake_spilled_tab(self, state):
+        # 텍스트를 다 불러온 뒤 실행 취소 기록과 수정 상태를 되돌림
+        editor = state.editor
+        state.spill.close()
+        state.spill = None
+        editor.history.close()
+        editor.history, state.history = state.history, None
+        editor.document().setModified(True)
+
+        # 자동 저장 기록에는 잠들기 전까지의 편집이 그대로 있으므로 기준을 다시 쓰지 않음
+        # (깨우는 동안 기록 파일을 다시 시작했으면 기준부터 씀)
+        if state.tab_id in self.journal_rebase:
+            self.journal_rebase.discard(state.tab_id)
+            self.attach_journal(state, on_disk=False)
+        elif self.journal is not None:
+            editor.journal = self.journal
+            editor.journal_id = state.tab_id
+
+    # ---- 잠자는 탭 ----
+
+    def tab_memory(self, state):
+        editor = state.editor
+        if not isinstance(editor, MyTextEdit):
+            return 0
+        # 화면용 QTextDocument 와 piece table 이 같은 텍스트를 따로 들고 있으므로 둘 다 셈
+        return (editor.document().characterCount() * self.memory_per_char
+                + editor.blockCount() * self.memory_per_block + editor.buffer.memory + editor.history.memory)
+
+    def schedule_hibernate(self):
+        if not self.hibernate_timer.isActive():
+            self.hibernate_timer.start()
+
+    def hibernate_tabs(self):
+        # 예산을 넘으면 현재 탭이 아닌 탭 중 가장 오래전에 본 탭부터 잠재움
+        current = self.tabs.currentWidget()
+        listed = self.search_results_panel.text_areas if self.search_results_panel is not None else []
+        total = 0
+        candidates = []
+        for tab_widget, state in self.tab_states.items():
+            memory = self.tab_memory(state)
+            total += memory
+            if (memory and tab_widget is not current and state.loader is None
+                    and (state.path is not None or state.dirty)
+                    and state.editor not in listed):
+                candidates.append((state.last_used, memory, tab_widget, state))
+        if total <= self.memory_budget:
+            return
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        for _, memory, tab_widget, state in candidates:
+            try:
+                self.hibernate_tab(tab_widget, state)
+            except OSError as e:
+                logging.warning(f'{state.path} 탭을 잠재우지 못함: {e}')
+                continue
+            total -= memory
+            if total <= self.memory_budget:
+                break
+
+    def hibernate_tab(self, tab_widget, state):
+        # 편집기와 줄 번호 영역을 없애고, 다시 열 때 필요한 것만 남김
+        editor = state.editor
+        cursor = editor.textCursor()
+        restore = (cursor.blockNumber(), cursor.positionInBlock(), editor.verticalScrollBar().value())
+
+        if state.dirty:
+            state.spill = pyEditor_fileio.spill_text(editor.buffer.snapshot().chunks(max_size=self.save_chunk_size))
+            state.history = editor.history
+            state.history.spill_all()
+        else:
+            st = os.stat(state.path)
+            state.fingerprint = (st.st_mtime_ns, st.st_size)
+            editor.history.close()
+        state.restore = restore
+
+        editor.journal = None
+        layout = tab_widget.layout()
+        while layout.count():
+            item = layout.takeAt(0)
+            if item.layout() is not None:
+                while item.layout().count():
+                    item.layout().takeAt(0)
+                item.layout().deleteLater()
+        for widget in (state.gutter, editor):
+            widget.setParent(None)
+            widget.deleteLater()
+        state.editor = None
+        state.gutter = None
+
+    # ---- 세션 ----
+
+    def save_session(self):
+        tabs = []
+        for index in range(self.tabs.count()):
+            state = self.tab_states.get(self.tabs.widget(index))
+            if state is None or state.path is None:
+                continue
+            if state.editor is None:
+                line, column, scroll = state.restore or (0, 0, 0)
+            elif isinstance(state.editor, LargeFileViewer):
+                line, column, scroll = state.editor.current_line, state.editor.current_column, 0
+            else:
+                cursor = state.editor.textCursor()
+                line, column = cursor.blockNumber(), cursor.positionInBlock()
+                scroll = state.editor.verticalScrollBar().value()
+            tabs.append({'path': os.path.abspath(state.path), 'encoding': state.encoding,
+                         'line': line, 'column': column, 'scroll': scroll})
 
-        if current_widget:
-            h_layout = current_widget.layout().itemAt(0)
+        session = {'active': self.tabs.currentIndex(), 'tabs': tabs}
+        try:
+            os.makedirs(os.path.dirname(self.session_path), exist_ok=True)
+            pyEditor_fileio.atomic_write(self.session_path, [json.dumps(session, ensure_ascii=False, indent=1)])
+        except OSError:
+            pass
 
-            if h_layout:
-                self.text_area = h_layout.itemAt(1).widget()
-                self.line_number_area = h_layout.itemAt(0).widget()
-                self.update_line_numbers()
+    def restore_session(self):
+        # 탭은 이름만 가진 빈 위젯으로 만들고, 실제 편집기와 파일 읽기는 처음 열 때 함
+        try:
+            with open(self.session_path, encoding='utf-8') as f:
+                session = json.load(f)
+            tabs = [tab for tab in session['tabs'] if os.path.isfile(tab['path'])]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if not tabs:
+            return
+
+        # 처음 만든 빈 탭은 세션 탭으로 바꿈
+        first = self.tabs.widget(0)
+        first_state = self.tab_states.get(first)
+        if self.tabs.count() == 1 and first_state is not None and first_state.path is None \
+                and not first_state.dirty:
+            self.tabs.removeTab(0)
+            self.tab_states.pop(first)
+            first_state.editor.history.close()
+            if first_state.editor.journal is not None:
+                first_state.editor.journal.close_tab(first_state.tab_id)
+            first.deleteLater()
+
+        self.restoring = True
+        for tab in tabs:
+            tab_widget = QWidget()
+            tab_widget.setLayout(QVBoxLayout())
+            state = TabState(None, None, tab['path'], tab.get('encoding', 'utf-8'))
+            state.restore = (tab.get('line', 0), tab.get('column', 0), tab.get('scroll', 0))
+            self.tab_states[tab_widget] = state
+            self.tabs.addTab(tab_widget, tab['path'])
+        self.restoring = False
+
+        active = session.get('active', 0)
+        if not 0 <= active < self.tabs.count():
+            active = 0
+        if self.tabs.currentIndex() == active:
+            self.update_current_tab(active)
+        else:
+            self.tabs.setCurrentIndex(active)
 
     def open_file(self):
         file_path, _ = QFileDialog.getOpenFileName(self, '열기', '', '텍스트 파일 (*.txt);;모든 파일 (*)')
 
         if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+            self.load_file(file_path)
 
-                self.add_tab()
+    def load_file(self, file_path):
+        # 인코딩은 파일 몇 군데만 읽어서 추측 (BOM, UTF-16, utf-8, cp949)
+        try:
+            large = os.path.getsize(file_path) >= self.large_file_threshold
+            encoding = pyEditor_encoding.detect_encoding(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, '오류', f'파일을 열 수 없습니다: {e}')
+            return
 
-                self.text_area.setPlainText(content)
-                self.tabs.setTabText(self.tabs.currentIndex(), file_path)
-                self.update_line_numbers()
+        if large:
+            self.open_viewer(file_path, encoding)
+            return
 
-            except Exception as e:
-                QMessageBox.critical(self, '오류', f'파일을 열 수 없습니다: {e}')
+        # 탭은 추측한 인코딩을 기억해 두었다가 저장할 때 같은 인코딩으로 씀
+        self.add_tab()
+
+        state = self.current_state()
+        state.path = file_path
+        state.encoding = encoding
+        self.tabs.setTabText(self.tabs.currentIndex(), file_path)
+        self.start_loader(state)
+
+    def start_loader(self, state, loader=None):
+        # 읽기/디코딩은 FileLoader 스레드에서 하고, GUI 는 받은 조각을 끝에 붙이기만 함
+        state.editor.setReadOnly(True)
+        state.editor.set_recording(False)
+        state.editor.journal = None
+
+        if loader is None:
+            loader = FileLoader(state.path, state.encoding, self)
+        state.loader = loader
+        loader.chunk_loaded.connect(lambda text: self.append_loaded_chunk(state, text))
+        loader.progress.connect(lambda done, total: self.show_load_progress(state, done, total))
+        loader.loaded.connect(lambda newline: self.finish_loading(state, newline))
+        loader.failed.connect(lambda message: self.fail_loading(state, message))
+        loader.finished.connect(loader.deleteLater)
+        loader.start()
+
+    def create_viewer(self, file_path, encoding):
+        # 뷰어는 바이트 단위로 줄바꿈을 찾으므로 ASCII 호환 인코딩만 그대로 씀
+        if encoding not in ('utf-8', 'utf-8-sig', 'cp949'):
+            encoding = 'utf-8'
+        import pyEditor_bigfile
+        try:
+            index = pyEditor_bigfile.LineIndex(file_path, encoding)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, '오류', f'파일을 열 수 없습니다: {e}')
+            return None
+
+        viewer = LargeFileViewer(index)
+        viewer.cursorPositionChanged.connect(self.schedule_update_line_numbers)
+        return viewer
+
+    def open_viewer(self, file_path, encoding='utf-8'):
+        viewer = self.create_viewer(file_path, encoding)
+        if viewer is None:
+            return
+        encoding = viewer.index.encoding
+
+        layout = QVBoxLayout()
+        layout.addWidget(viewer)
+        tab_widget = QWidget()
+        tab_widget.setLayout(layout)
+
+        self.tab_states[tab_widget] = TabState(viewer, None, file_path, encoding)
+        self.tabs.addTab(tab_widget, file_path)
+        self.tabs.setCurrentWidget(tab_widget)
+
+    def go_to_line(self):
+        state = self.current_state()
+        if state is None:
+            return
+
+        if isinstance(state.editor, LargeFileViewer):
+            current, count = state.editor.current_line + 1, state.editor.index.line_count()
+        else:
+            current, count = state.editor.textCursor().blockNumber() + 1, state.editor.buffer.line_count()
+
+        number, ok = QInputDialog.getInt(self, '줄로 이동', '줄 번호:', current, 1, max(1, count))
+        if ok:
+            state.editor.go_to_line(number - 1)
+
+    def append_loaded_chunk(self, state, text):
+        if state.loader is None:
+            return
+
+        # 줄 경계에서 잘라 두면 강조 표시가 같은 줄을 두 번 칠하지 않음
+        size = FileLoader.APPEND_SLICE
+        start = 0
+        while len(text) - start > size:
+            end = text.rfind('\n', start, start + size) + 1
+            if end <= start:
+                end = start + size
+            state.slices.append((text[start:end], False))
+            start = end
+        state.slices.append((text[start:], True))
+
+        if state not in self.appending:
+            self.appending.append(state)
+        self.append_timer.start()
+
+    def append_step(self):
+        deadline = time.perf_counter() + FileLoader.APPEND_SECONDS
+        while self.appending and time.perf_counter() < deadline:
+            state = self.appending[0]
+            if state.loader is None or not state.slices:
+                # 닫았거나 취소한 탭
+                state.slices.clear()
+                self.appending.pop(0)
+                continue
+
+            cursor = QTextCursor(state.editor.document())
+            cursor.movePosition(QTextCursor.End)
+            while state.slices and time.perf_counter() < deadline:
+                text, last = state.slices.popleft()
+                cursor.insertText(text)
+                if last:
+                    state.loader.chunk_done()
+            if not state.slices:
+                self.appending.pop(0)
+            else:
+                # 여러 탭을 불러오는 중이면 돌아가며 붙임
+                self.appending.append(self.appending.pop(0))
+
+        if not self.appending:
+            self.append_timer.stop()
+
+    def show_load_progress(self, state, done, total):
+        if state.editor is self.text_area and total:
+            self.statusBar.showMessage(f"{state.path} 불러오는 중... {done * 100 // total}% (Esc: 취소)")
+
+    def end_loading(self, state):
+        state.loader = None
+        state.slices.clear()
+        state.editor.setReadOnly(False)
+        state.editor.set_recording(True)
+        state.editor.document().setModified(False)
+
+    def finish_loading(self, state, newline='\n'):
+        if state.loader is None:
+            return
+
+        state.newline = newline
+        self.end_loading(state)
+        if state.spill is not None:
+            self.wake_spilled_tab(state)
+        else:
+            self.attach_journal(state)
+        if state.restore is not None:
+            self.apply_restore(state)
+        if state.pending_line is not None:
+            state.editor.go_to_line(state.pending_line)
+            state.pending_line = None
+        if state.editor is self.text_area:
+            self.update_line_numbers()
+        self.schedule_hibernate()
+
+    def apply_restore(self, state):
+        # 세션에 저장해 둔 커서와 스크롤 위치로 돌아감
+        line, column, scroll = state.restore
+        state.restore = None
+        block = state.editor.document().findBlockByNumber(line)
+        if block.isValid():
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + min(column, block.length() - 1))
+            state.editor.setTextCursor(cursor)
+        state.editor.verticalScrollBar().setValue(scroll)
+
+    def end_partial_loading(self, state):
+        # 일부만 불러온 탭은 파일과의 연결을 끊고 제목 없는 수정된 탭으로 남김
+        # (그대로 저장하거나, 파일에서 바꾸기가 수정 없는 탭으로 보고 저장하면 파일이 잘림)
+        # 남은 내용을 저장하려면 다른 이름으로 저장해야 함
+        self.end_loading(state)
+        path = state.path
+        state.path = None
+        state.editor.document().setModified(True)
+        self.attach_journal(state, on_disk=False)
+        for tab_widget, tab_state in self.tab_states.items():
+            if tab_state is state:
+                self.tabs.setTabText(self.tabs.indexOf(tab_widget), f'{path} (일부)')
+                break
+        return path
+
+    def fail_loading(self, state, message):
+        if state.loader is None:
+            return
+
+        self.end_partial_loading(state)
+        QMessageBox.critical(self, '오류', f'파일을 열 수 없습니다: {message}')
+
+    def cancel_loading(self, state=None, closing=False):
+        state = state or self.current_state()
+
+        if state is not None and state.loader is not None:
+            if state.spill is not None and not closing:
+                # 잠든 탭을 깨우는 중 - 저장하지 않은 텍스트가 임시 파일에만 있으므로 끝까지 불러옴
+                return
+            state.loader.cancel()
+            if closing:
+                # 끝낼 때는 경로를 남겨야 세션에 들어가서 다음에 파일 전체를 다시 불러옴
+                self.end_loading(state)
+                return
+            path = self.end_partial_loading(state)
+            self.statusBar.showMessage(f"{path} 불러오기 취소됨 - 일부만 불러온 탭은 다른 이름으로 저장해야 합니다")
 
     def save_file(self):
-        current_tab = self.tabs.currentIndex()
-        tab_text = self.tabs.tabText(current_tab)
+        state = self.current_state()
 
-        if tab_text == '새 파일':
+        if state is None or state.editor.isReadOnly():
+            return
+
+        if state.path is None:
             self.save_as()
         else:
-            file_path = tab_text
-            content = self.text_area.toPlainText()
+            file_path = state.path
 
             try:
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
+                self.write_snapshot(file_path, state)
+                state.editor.mark_saved()
+                self.attach_journal(state)
             except Exception as e:
                 QMessageBox.critical(self, '오류', f'파일을 저장할 수 없습니다: {e}')
 
     def save_as(self):
         file_path, _ = QFileDialog.getSaveFileName(self, '다른 이름으로 저장', '', '텍스트 파일 (*.txt);;모든 파일 (*)')
 
-        if file_path:
-            content = self.text_area.toPlainText()
+        state = self.current_state()
+
+        if file_path and state is not None and not state.editor.isReadOnly():
             try:
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
+                self.write_snapshot(file_path, state)
 
+                state.path = file_path
+                state.editor.mark_saved()
+                self.attach_journal(state)
                 self.tabs.setTabText(self.tabs.currentIndex(), file_path)
             except Exception as e:
                 QMessageBox.critical(self, '오류', f'파일을 저장할 수 없습니다: {e}')
 
+    # 저장할 때 한 번에 쓰는 최대 글자 수
+    save_chunk_size = 1024 * 1024
+
+    def write_snapshot(self, file_path, state):
+        # toPlainText() 로 전체를 복사하지 않고 버퍼 스냅샷을 일정 크기 조각으로 나눠
+        # 임시 파일에 쓴 뒤 원래 파일과 바꿔치기 (원래 인코딩/줄바꿈 유지)
+        snapshot = state.editor.buffer.snapshot()
+        pyEditor_fileio.atomic_write(file_path, snapshot.chunks(max_size=self.save_chunk_size),
+                                     encoding=state.encoding, newline=state.newline)
+        self.written_paths.add(os.path.abspath(file_path))
+
     def close_tab(self):
         current_tab = self.tabs.currentIndex()
+        tab_widget = self.tabs.widget(current_tab)
         self.tabs.removeTab(current_tab)
 
+        state = self.tab_states.pop(tab_widget, None)
+        waking = state is not None and state.loader is not None and state.spill is not None
+        if state is not None and state.loader is not None:
+            loader = state.loader
+            state.loader = None
+            loader.cancel()
+            if waking:
+                # 깨우다가 닫은 탭 - 작업 스레드가 아직 임시 파일을 읽고 있을 수 있으므로 끝난 뒤에 닫음
+                spill = state.spill
+                state.spill = None
+                loader.finished.connect(spill.close)
+                if not loader.isRunning():
+                    spill.close()
+        if state is not None and isinstance(state.editor, LargeFileViewer):
+            state.editor.close_index()
+        elif state is not None and state.editor is not None:
+            state.editor.history.close()
+            if state.editor.journal is not None:
+                state.editor.journal.close_tab(state.tab_id)
+            elif waking:
+                state.history.close()
+                if self.journal is not None:
+                    self.journal.close_tab(state.tab_id)
+        elif state is not None and (state.spill is not None or state.fingerprint is not None):
+            # 잠든 탭
+            if state.spill is not None:
+                state.spill.close()
+                state.history.close()
+            if self.journal is not None:
+                self.journal.close_tab(state.tab_id)
+
+        # 탭 위젯은 QTabWidget 의 QStackedWidget 에 자식으로 남아 있으므로 직접 지움
+        # (편집기, 문서, 구문 강조, 찾기 색인이 같이 지워짐)
+        if state is not None:
+            if self.text_area is state.editor:
+                self.text_area = None
+            if self.line_number_area is state.gutter:
+                self.line_number_area = None
+        if tab_widget is not None:
+            tab_widget.deleteLater()
+
+    def closeEvent(self, event):
+        # 불러오는 중인 스레드와 파일에서 찾기를 정리한 뒤 종료
+        if self.find_in_files_panel is not None:
+            self.find_in_files_panel.stop_search()
+        if self.search_results_panel is not None:
+            self.search_results_panel.stop()
+        for state in self.tab_states.values():
+            if state.loader is not None:
+                loader = state.loader
+                self.cancel_loading(state, closing=True)
+                loader.wait()
+        self.save_session()
+
+        # 정상 종료이므로 자동 저장 기록은 지움
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        super().closeEvent(event)
+
+    def undo(self):
+        if isinstance(self.text_area, MyTextEdit):
+            self.text_area.undo()
+
+    def redo(self):
+        if isinstance(self.text_area, MyTextEdit):
+            self.text_area.redo()
+
     def cut(self):
-        self.text_area.cut()
+        if self.text_area is not None:
+            self.text_area.cut()
 
     def copy(self):
-        self.text_area.copy()
+        if self.text_area is not None:
+            self.text_area.copy()
 
     def paste(self):
-        self.text_area.paste()
+        if self.text_area is not None:
+            self.text_area.paste()
 
     def choose_font(self):
+        if self.text_area is None:
+            return
         font, ok = QFontDialog.getFont(self.text_area.font(), self)
 
         if ok:
             self.text_area.setFont(font)
             self.update_line_numbers()
 
-        self.tabs.currentChanged.connect(self.update_current_tab)
+    def schedule_update_line_numbers(self):
+        # 키 입력 한 번에 여러 시그널이 와도 실제 갱신은 한 번만 함
+        if not self.update_timer.isActive():
+            self.update_timer.start()
 
     def update_line_numbers(self):
+        self.update_timer.stop()
+
+        if self.text_area is None:
+            # 탭을 모두 닫음
+            self.statusBar.clearMessage()
+            return
+
+        if isinstance(self.text_area, LargeFileViewer):
+            index = self.text_area.index
+            text = (f"{self.tabs.tabText(self.tabs.currentIndex())} - 행: {self.text_area.current_line + 1}"
+                    f" / {index.line_count()}, 열: {self.text_area.current_column + 1} [{index.encoding}] (읽기 전용)")
+            if not index.done():
+                text += f" 색인 중... {index.indexed * 100 // max(1, index.size)}%"
+            self.statusBar.showMessage(text)
+            return
+
         cursor = self.text_area.textCursor()
         block = cursor.block()
         line_count = block.blockNumber() + 1
         col_count = cursor.positionInBlock() + 1
 
-        text = f"{self.tabs.tabText(self.tabs.currentIndex())} - 행: {line_count}, 열: {col_count}"
-        self.statusBar.showMessage(text)
-
-        self.line_number_area.setFixedWidth(self.line_number_area_width())
-        self.line_number_area.update()
-
-    def line_number_area_width(self):
+        # 불러오는 중에는 진행률 표시를 덮어쓰지 않음
+        state = self.current_state()
+        if state is None or state.loader is None:
+            text = (f"{self.tabs.tabText(self.tabs.currentIndex())} - 행: {line_count}, 열: {col_count}"
+                    f" [{state.encoding if state is not None else 'utf-8'}]")
+            self.statusBar.showMessage(text)
+
+        # 줄 번호 영역 폭은 자릿수나 폰트가 바뀔 때만 다시 계산
+        gutter = self.line_number_area
+        width_key = (self.line_number_digits(), self.text_area.font().key())
+        if gutter.width_key != width_key:
+            gutter.width_key = width_key
+            gutter.setFixedWidth(self.line_number_area_width())
+        gutter.update()
+
+    def line_number_digits(self):
         digits = len(str(self.text_area.blockCount()))
 
         if digits < 8:
             digits = 8
 
-        space = 3 + self.text_area.fontMetrics().width('9') * digits
+        return digits
+
+    def line_number_area_width(self):
+        space = 3 + self.text_area.fontMetrics().horizontalAdvance('9') * self.line_number_digits()
         return space
 
 if __name__ == '__main__':
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()   # 파일에서 찾기의 프로세스 풀 (PyInstaller 빌드용)
     setup_logging()
     #logger 생성
     logger = logging.getLogger(__name__)
 
     app = QApplication(sys.argv)
+    app_created = time.time()
+
+    # 처음 뜬 편집기가 나중에 실행된 pyEditor 의 파일 목록을 받음
+    instance_server = None
+    if pyEditor_instance.NEW_INSTANCE_OPTION not in sys.argv:
+        instance_server = InstanceServer(app)
+        instance_server.listen()
+        app.aboutToQuit.connect(instance_server.close)
+
     editor = TextEditor()
+    if os.environ.get('PYEDITOR_STARTUP_REPORT'):
+        StartupProbe(editor, os.environ['PYEDITOR_STARTUP_REPORT'], app_created)
     editor.show()
+    editor.open_paths(pyEditor_instance.file_arguments(sys.argv[1:]))
+    if instance_server is not None:
+        instance_server.files_received.connect(editor.open_from_instance)
     sys.exit(app.exec_())
@@ -0,0 +1,138 @@
+# pyEditor_bigfile.py
+# 큰 파일을 읽기 전용으로 보기 위한 줄 위치 색인
+#   - 파일 전체를 mmap 으로 열고, 줄 시작 위치(바이트 오프셋)만 array 에 모아 둠
+#   - 파일 내용을 str 로 한꺼번에 만들지 않고, 필요한 줄만 그때그때 디코딩
+#   - numpy 가 있으면 줄바꿈 찾기를 벡터 연산으로, 없으면 mmap.find 로 처리
+#
+# 사용 예:
+#   index = LineIndex('big.log')
+#   while not index.build_step():
+#       pass
+#   print(index.line_count(), index.line(0))
+
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class LineIndex:
+    STEP_SIZE = 16 * 1024 * 1024      # build_step 한 번에 훑는 바이트 수
+    SEARCH_BLOCK_SIZE = 4 * 1024 * 1024 # find_all 이 한 번에 훑는 바이트 수
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.size = os.path.getsize(path)
+        self.offsets = array('q', [0])  # 각 줄의 시작 바이트 위치
+        self.indexed = 0                # 여기까지 줄바꿈을 찾았음
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b''
+        self.file.close()
+
+    def done(self):
+        return self.indexed >= self.size
+
+    def build_step(self, step_size=None):
+        # 다음 조각에서 줄바꿈 위치를 찾아 색인에 추가. 끝까지 다 했으면 True
+        if self.done():
+            return True
+
+        start = self.indexed
+        end = min(self.size, start + (step_size or self.STEP_SIZE))
+
+        if numpy is not None:
+            chunk = numpy.frombuffer(self.data, dtype=numpy.uint8, count=end - start, offset=start)
+            newlines = numpy.flatnonzero(chunk == 10)
+            newlines += start + 1
+            self.offsets.frombytes(newlines.astype(numpy.int64).tobytes())
+        else:
+            find = self.data.find
+            append = self.offsets.append
+            pos = find(b'\n', start, end)
+            while pos >= 0:
+                append(pos + 1)
+                pos = find(b'\n', pos + 1, end)
+
+        self.indexed = end
+        return self.done()
+
+    def line_count(self):
+        # 색인이 끝나지 않았으면 마지막 줄은 아직 완전하지 않으므로 빼고 셈
+        if self.done():
+            return len(self.offsets)
+        return len(self.offsets) - 1
+
+    def line_span(self, number):
+        start = self.offsets[number]
+        if number + 1 < len(self.offsets):
+            end = self.offsets[number + 1] - 1
+        else:
+            end = self.size
+        if end > start and self.data[end - 1:end] == b'\r':
+            end -= 1
+        return start, end
+
+    def line(self, number):
+        start, end = self.line_span(number)
+        return self.data[start:end].decode(self.encoding, errors='replace')
+
+    def line_of_offset(self, offset):
+        return bisect_right(self.offsets, offset) - 1
+
+    def position_of(self, offset):
+        # 바이트 위치를 (줄, 열) 로 바꿈
+        number = self.line_of_offset(offset)
+        column = len(self.data[self.offsets[number]:offset].decode(self.encoding, errors='replace'))
+        return number, column
+
+    def is_char_start(self, offset):
+        # cp949 는 둘째 바이트가 0x41~0xFE 라서 바이트로 찾은 위치가 글자 중간일 수 있음
+        # 0x41 보다 작은 바이트는 글자의 일부가 아니므로 그 뒤부터 글자 단위로 세어 봄
+        # (utf-8 은 글자 중간 바이트가 따로 구분되므로 바이트로 찾으면 항상 글자 경계)
+        if self.encoding != 'cp949':
+            return True
+        data = self.data
+        start = offset
+        while start > 0 and data[start - 1] >= 0x41:
+            start -= 1
+        while start < offset:
+            start += 2 if data[start] >= 0x81 else 1
+        return start == offset
+
+    def find_all(self, text, start=0, end=None, block_size=None):
+        # start~end 바이트 범위 (기본: 색인이 끝난 곳까지) 에서 글자 경계에서 시작하는 text 의 위치를
+        # 겹치지 않게 찾아서 block_size 마다 목록으로 돌려줌 (없어도 빈 목록을 돌려줌)
+        # mmap.find 는 GIL 을 쥐고 돌기 때문에, 작업 스레드에서 쓸 때 GUI 스레드가 오래 기다리지 않도록 나눠서 찾음
+        needle = text.encode(self.encoding)
+        if not needle:
+            return
+        if end is None:
+            end = self.indexed
+        block_size = block_size or self.SEARCH_BLOCK_SIZE
+
+        pos = start
+        while pos < end:
+            # 조각 끝에 걸친 일치도 찾도록 조금 더 읽음 (시작 위치는 항상 이 조각 안)
+            limit = min(end, pos + block_size)
+            block_end = min(end, limit + len(needle) - 1)
+            found = []
+            hit = self.data.find(needle, pos, block_end)
+            while hit >= 0:
+                if self.is_char_start(hit):
+                    found.append(hit)
+                    hit = self.data.find(needle, hit + len(needle), block_end)
+                else:
+                    hit = self.data.find(needle, hit + 1, block_end)
+            yield found
+            pos = max(limit, found[-1] + len(needle)) if found else limit
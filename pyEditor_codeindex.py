@@ -0,0 +1,245 @@
+# pyEditor_codeindex.py
+# 프로젝트 폴더용 디스크 트라이그램 색인 (sqlite3, Qt 와 무관)
+#   - 폴더마다 캐시 폴더(~/.cache/pyEditor/index) 에 sqlite 파일 하나를 만듦
+#   - update() 는 os.walk 로 파일 목록을 훑으면서 mtime/크기가 바뀐 파일만 다시 읽음
+#     max_age 를 주면 그 시간 안에 이미 훑었을 때는 건너뜀 - 그 사이 편집기가 저장한 파일은 refresh() 로 알려줌
+#   - search() 는 색인에서 찾을 내용의 3글자 조각을 모두 가진 파일만 골라서 실제로 찾음
+#     (정규식/3글자 미만처럼 좁힐 수 없으면 후보가 많으므로 파일에서 찾기와 같은 프로세스 풀로 찾음)
+#
+# 사용 예 (명령행):
+#   python pyEditor_codeindex.py 폴더 찾을내용 [--regex] [--case] [--word] [--ext .py .txt] [--no-update]
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pyEditor_search
+import pyEditor_findfiles
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pyEditor', 'index')
+MAX_INDEX_SIZE = 16 * 1024 * 1024   # 이보다 큰 파일은 색인하지 않고 항상 후보로 봄
+PARALLEL_THRESHOLD = 64             # 바뀐 파일이 이보다 많으면 프로세스 풀로 읽음
+
+# 파일 상태
+INDEXED = 0
+BINARY = 1
+UNINDEXED = 2
+
+
+def gram_code(gram):
+    # 3글자 조각을 정수 하나로 (유니코드 코드 포인트는 21비트 이내)
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def query_codes(query):
+    return sorted(gram_code(gram) for gram in pyEditor_search.trigrams(query))
+
+
+def file_grams(paths):
+    # 프로세스 풀 작업 단위: [(path, mtime_ns, size, 상태, 조각 코드 목록), ...]
+    results = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            if st.st_size > MAX_INDEX_SIZE:
+                results.append((path, st.st_mtime_ns, st.st_size, UNINDEXED, []))
+                continue
+            text = pyEditor_findfiles.read_text(path)
+        except OSError:
+            continue
+        if text is None:
+            results.append((path, st.st_mtime_ns, st.st_size, BINARY, []))
+        else:
+            results.append((path, st.st_mtime_ns, st.st_size, INDEXED,
+                            [gram_code(gram) for gram in pyEditor_search.trigrams(text)]))
+    return results
+
+
+class CodeIndex:
+    def __init__(self, root, cache_dir=CACHE_DIR):
+        self.root = os.path.abspath(root)
+        os.makedirs(cache_dir, exist_ok=True)
+        name = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16] + '.sqlite'
+        self.db_path = os.path.join(cache_dir, name)
+
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime INTEGER, size INTEGER, state INTEGER);
+            CREATE TABLE IF NOT EXISTS grams (
+                gram INTEGER, file_id INTEGER, PRIMARY KEY (gram, file_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS grams_file ON grams (file_id);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+        ''')
+
+    def close(self):
+        self.db.close()
+
+    def updated_at(self):
+        # 마지막으로 폴더 전체를 훑은 시각 (time.time()), 없으면 0
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'updated'").fetchone()
+        return row[0] if row else 0
+
+    def update(self, workers=None, max_age=0, skip_dirs=pyEditor_findfiles.SKIP_DIRS):
+        # 바뀐 파일만 다시 색인. 반환값: (다시 읽은 파일 수, 지운 파일 수)
+        # max_age 초 안에 같은 skip_dirs 로 이미 훑었으면 파일마다 stat 하지 않고 그대로 씀
+        started = time.time()
+        skipped = '\n'.join(sorted(skip_dirs))
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'skip_dirs'").fetchone()
+        if max_age and started - self.updated_at() < max_age and row is not None and row[0] == skipped:
+            return 0, 0
+
+        stored = {path: (file_id, mtime, size)
+                  for file_id, path, mtime, size in self.db.execute('SELECT id, path, mtime, size FROM files')}
+        seen = set()
+        changed = []
+
+        for path in pyEditor_findfiles.walk_files(self.root, skip_dirs=skip_dirs):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            old = stored.get(path)
+            if old is None or old[1] != st.st_mtime_ns or old[2] != st.st_size:
+                changed.append(path)
+
+        removed = [stored[path][0] for path in stored.keys() - seen]
+        self.store(stored, changed, removed, workers)
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('updated', ?)", (started,))
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('skip_dirs', ?)", (skipped,))
+        return len(changed), len(removed)
+
+    def refresh(self, paths, skip_dirs=pyEditor_findfiles.SKIP_DIRS):
+        # 바뀐 줄 아는 파일 (편집기에서 저장/바꾸기 한 파일) 만 다시 확인. 반환값은 update 와 같음
+        # update 가 훑지 않는 파일 (폴더 밖, 건너뛰는 폴더 안) 은 색인에 넣지 않음
+        stored = {}
+        changed = []
+        removed = []
+        for path in paths:
+            path = os.path.abspath(path)
+            if os.path.commonpath([self.root, path]) != self.root:
+                continue
+            folders = os.path.relpath(path, self.root).split(os.sep)[:-1]
+            if any(name in skip_dirs or name.startswith('.') for name in folders):
+                continue
+            row = self.db.execute('SELECT id, mtime, size FROM files WHERE path = ?', (path,)).fetchone()
+            if row is not None:
+                stored[path] = row
+            try:
+                st = os.stat(path)
+            except OSError:
+                if row is not None:
+                    removed.append(row[0])
+                continue
+            if row is None or row[1] != st.st_mtime_ns or row[2] != st.st_size:
+                changed.append(path)
+
+        self.store(stored, changed, removed)
+        return len(changed), len(removed)
+
+    def store(self, stored, changed, removed, workers=None):
+        with self.db:
+            for file_id in removed:
+                self.remove_file(file_id)
+            for path, mtime, size, state, codes in self.read_changed(changed, workers):
+                old = stored.get(path)
+                if old is not None:
+                    self.remove_file(old[0])
+                cursor = self.db.execute('INSERT INTO files (path, mtime, size, state) VALUES (?, ?, ?, ?)',
+                                         (path, mtime, size, state))
+                file_id = cursor.lastrowid
+                self.db.executemany('INSERT INTO grams (gram, file_id) VALUES (?, ?)',
+                                    ((code, file_id) for code in codes))
+
+    def read_changed(self, paths, workers=None):
+        if len(paths) < PARALLEL_THRESHOLD:
+            yield from file_grams(paths)
+            return
+
+        batches = [paths[i:i + pyEditor_findfiles.BATCH_SIZE]
+                   for i in range(0, len(paths), pyEditor_findfiles.BATCH_SIZE)]
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=context) as pool:
+            for results in pool.map(file_grams, batches):
+                yield from results
+
+    def remove_file(self, file_id):
+        self.db.execute('DELETE FROM grams WHERE file_id = ?', (file_id,))
+        self.db.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def candidates(self, query, regex=False, extensions=None):
+        # query 가 들어 있을 수 있는 파일 경로 목록
+        codes = [] if regex else query_codes(query)
+
+        if codes:
+            marks = ','.join('?' * len(codes))
+            rows = self.db.execute(
+                'SELECT path FROM files WHERE state = ? AND id IN ('
+                ' SELECT file_id FROM grams WHERE gram IN (%s) GROUP BY file_id HAVING COUNT(*) = ?)'
+                ' UNION SELECT path FROM files WHERE state = ?' % marks,
+                (INDEXED, *codes, len(codes), UNINDEXED))
+        else:
+            # 정규식이나 3글자 미만은 색인으로 좁힐 수 없음
+            rows = self.db.execute('SELECT path FROM files WHERE state != ?', (BINARY,))
+
+        paths = [path for (path,) in rows]
+        if extensions:
+            paths = [path for path in paths if os.path.splitext(path)[-1] in extensions]
+        return sorted(paths)
+
+    def search(self, query, regex=False, case_sensitive=False, whole_word=False, extensions=None,
+               workers=None, cancelled=lambda: False):
+        # 후보 파일만 실제로 열어서 찾음. (path, matches) 를 하나씩 돌려줌
+        paths = self.candidates(query, regex, extensions)
+        options = (query, regex, case_sensitive, whole_word)
+        if len(paths) < PARALLEL_THRESHOLD:
+            results, scanned = pyEditor_findfiles.search_files(paths, *options)
+            yield from results
+            return
+
+        for results, scanned in pyEditor_findfiles.run_batches(pyEditor_findfiles.search_files, paths, options,
+                                                              workers, cancelled):
+            yield from results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pyEditor 프로젝트 색인 검색')
+    parser.add_argument('root')
+    parser.add_argument('query')
+    parser.add_argument('--regex', action='store_true')
+    parser.add_argument('--case', action='store_true', help='대소문자 구분')
+    parser.add_argument('--word', action='store_true', help='단어 단위')
+    parser.add_argument('--ext', nargs='*', default=None, help='확장자 (예: .py .txt)')
+    parser.add_argument('--skip', nargs='*', default=None, help='건너뛸 폴더 이름 (기본: build dist 등)')
+    parser.add_argument('--no-update', action='store_true', help='색인을 갱신하지 않고 바로 찾음')
+    args = parser.parse_args(argv)
+
+    index = CodeIndex(args.root)
+    start = time.perf_counter()
+    if not args.no_update:
+        skip_dirs = pyEditor_findfiles.SKIP_DIRS if args.skip is None else set(args.skip)
+        changed, removed = index.update(skip_dirs=skip_dirs)
+        print(f'# 색인 갱신: {changed}개 다시 읽음, {removed}개 지움 ({time.perf_counter() - start:.3f}s)',
+              file=sys.stderr)
+
+    start = time.perf_counter()
+    count = 0
+    for path, matches in index.search(args.query, args.regex, args.case, args.word, args.ext):
+        for line, column, text in matches:
+            print(f'{path}:{line + 1}:{column + 1}: {text}')
+            count += 1
+    print(f'# {count}개 찾음 ({time.perf_counter() - start:.3f}s)', file=sys.stderr)
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# pyEditor_encoding.py
+# 파일 인코딩 추측 (Qt 와 무관)
+#   - 파일 앞부분과 일정한 간격으로 떨어진 몇 군데만 조금씩 읽어서 판단 (파일 전체를 읽지 않음)
+#   - BOM 이 있으면 BOM 으로 바로 결정, 없으면 NUL 위치로 UTF-16 을 먼저 확인
+#   - 나머지는 utf-8 / cp949 로 각각 디코딩해 보고 오류 수와 한글 비율로 점수를 매김
+#     (cp949 는 EUC-KR 을 포함하므로 jump2python-main/07-1/euc_kr.py 같은 파일도 열 수 있음)
+#
+# 사용 예:
+#   encoding = detect_encoding('euc_kr.txt')    -> 'cp949'
+#   python pyEditor_encoding.py 파일...         (파일마다 추측한 인코딩과 걸린 시간 출력)
+
+import codecs
+import os
+import re
+import sys
+import time
+
+SAMPLE_SIZE = 4096          # 한 군데에서 읽는 바이트 수
+SAMPLE_COUNT = 4            # 앞부분 말고 더 읽어 볼 곳의 수
+CANDIDATES = ('utf-8', 'cp949')
+DEFAULT_ENCODING = 'utf-8'
+UNLIKELY_RE = re.compile('[^\x00-\x7f가-힣]')  # ASCII 도 한글 음절도 아닌 글자
+
+# 긴 BOM 을 먼저 확인해야 함 (UTF-32 LE BOM 은 UTF-16 LE BOM 으로 시작)
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+def bom_encoding(head):
+    # BOM 으로 정한 인코딩. 'utf-16'/'utf-32' 코덱은 BOM 을 떼고 읽고 저장할 때 이 컴퓨터의
+    # 바이트 순서로 BOM 을 붙이므로, 바이트 순서가 다르면 -le/-be 로 읽어서 BOM 을 글자로 남겨 둠
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            if encoding == 'utf-8-sig':
+                return encoding
+            family, order = encoding.rsplit('-', 1)
+            native = 'le' if sys.byteorder == 'little' else 'be'
+            return family if order == native else encoding
+    return None
+
+
+def utf16_without_bom(head):
+    # ASCII 가 많은 UTF-16 은 짝수 또는 홀수 자리에 NUL 이 몰려 있음
+    if len(head) < 4:
+        return None
+    even = head[0::2].count(0)
+    odd = head[1::2].count(0)
+    half = len(head) // 2
+    if odd > half * 0.3 and even < half * 0.05:
+        return 'utf-16-le'
+    if even > half * 0.3 and odd < half * 0.05:
+        return 'utf-16-be'
+    return None
+
+
+def read_samples(file, size, sample_size=SAMPLE_SIZE, count=SAMPLE_COUNT):
+    # 앞부분 하나와, 나머지 구간을 count 등분한 지점마다 하나씩 읽음
+    file.seek(0)
+    samples = [file.read(sample_size)]
+    if size <= sample_size * (count + 1):
+        samples[0] += file.read()
+        return samples
+
+    stride = (size - sample_size) // count
+    for i in range(1, count + 1):
+        file.seek(min(i * stride, size - sample_size))
+        data = file.read(sample_size)
+        # 멀티바이트 글자 중간에서 시작하지 않도록 첫 줄바꿈 뒤부터 씀
+        # (utf-8 과 cp949 모두 줄바꿈 바이트는 다른 글자의 일부가 될 수 없음)
+        newline = data.find(b'\n')
+        if newline >= 0:
+            samples.append(data[newline + 1:])
+    return samples
+
+
+def score(samples, encoding):
+    # 점수가 낮을수록 그럴듯함 - 디코딩 오류 하나는 크게, 한글이 아닌 비 ASCII 글자는 작게 셈
+    errors = 0
+    others = 0
+    for data in samples:
+        # 조각 끝이 글자 중간에서 잘릴 수 있으므로 final=False 로 디코딩
+        decoder = codecs.getincrementaldecoder(encoding)('replace')
+        text = decoder.decode(data, final=False)
+        errors += text.count('�')
+        if encoding != 'utf-8':
+            others += len(UNLIKELY_RE.findall(text))
+    return errors * 100 + others
+
+
+def detect_bytes(samples):
+    head = samples[0] if samples else b''
+    encoding = bom_encoding(head) or utf16_without_bom(head[:SAMPLE_SIZE])
+    if encoding:
+        return encoding
+
+    # 비 ASCII 바이트가 없으면 어떤 인코딩이든 같으므로 기본값
+    if all(data.isascii() for data in samples):
+        return DEFAULT_ENCODING
+
+    # 오류 없이 utf-8 로 읽히면 거의 확실히 utf-8 이므로 다른 후보는 보지 않음
+    scores = []
+    for index, encoding in enumerate(CANDIDATES):
+        points = score(samples, encoding)
+        if points == 0:
+            return encoding
+        scores.append((points, index, encoding))
+    return min(scores)[2]
+
+
+def detect_encoding(path, sample_size=SAMPLE_SIZE, count=SAMPLE_COUNT):
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        return detect_bytes(read_samples(file, size, sample_size, count))
+
+
+def main(argv=None):
+    for path in (argv if argv is not None else sys.argv[1:]):
+        start = time.perf_counter()
+        encoding = detect_encoding(path)
+        print(f'{path}: {encoding} ({(time.perf_counter() - start) * 1000:.3f}ms)')
+
+
+if __name__ == '__main__':
+    main()
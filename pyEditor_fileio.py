@@ -0,0 +1,108 @@
+# pyEditor_fileio.py
+# pyEditor 파일 쓰기 도우미
+#   - 같은 디렉터리의 임시 파일에 조각 단위로 쓰고, fsync 후 원래 파일 위로 이름을 바꿈
+#   - 쓰다가 죽어도 원래 파일은 그대로 남고, 반쯤 쓰인 파일은 생기지 않음
+#   - 심볼릭 링크는 링크가 가리키는 파일을 바꾸고, 새 파일은 open() 으로 만든 것과 같은 권한으로 만듦
+#   - spill_text / read_spill 은 텍스트를 압축해서 이름 없는 임시 파일에 잠시 옮겨 둠
+#
+# 사용 예:
+#   atomic_write('a.txt', ['hello\n', 'world\n'], encoding='cp949', newline='\r\n')
+#   file = spill_text(['hello\n', 'world\n']);  text = ''.join(text for _, text in read_spill(file))
+
+import codecs
+import os
+import stat
+import tempfile
+import zlib
+
+SPILL_BLOCK_SIZE = 1024 * 1024
+
+
+def read_umask():
+    # umask 는 바꿔 봐야만 읽을 수 있으므로, 다른 스레드가 파일을 만들기 전인 import 때 한 번만 읽음
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# mkstemp 는 0600 으로 만들므로, 없던 파일은 open() 과 같이 0666 에서 umask 를 뺀 권한으로 바꿈
+NEW_FILE_MODE = 0o666 & ~read_umask()
+
+
+def atomic_write(path, chunks, encoding='utf-8', newline='\n'):
+    # chunks: 문자열 조각들 (한꺼번에 메모리에 올리지 않고 차례대로 씀)
+    # 심볼릭 링크를 임시 파일로 덮어쓰지 않도록 실제 파일 경로에서 바꿔치기함
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+
+    try:
+        with open(fd, 'w', encoding=encoding, newline=newline) as file:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+
+        # 원래 파일의 권한을 그대로 유지 (없던 파일이면 보통 새 파일 권한)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    fsync_directory(directory)
+
+
+def fsync_directory(directory):
+    # 이름 바꾸기까지 디스크에 남도록 디렉터리도 fsync (지원하지 않는 OS 는 건너뜀)
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def spill_text(chunks):
+    # 닫으면 사라지는 임시 파일에 압축해서 씀 (빠른 압축 수준 사용)
+    file = tempfile.TemporaryFile(prefix='pyEditor-spill-')
+    try:
+        compressor = zlib.compressobj(1)
+        for chunk in chunks:
+            file.write(compressor.compress(chunk.encode('utf-8', 'surrogatepass')))
+        file.write(compressor.flush())
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+def read_spill(file, first_size=64 * 1024, size=SPILL_BLOCK_SIZE):
+    # spill_text 로 쓴 파일을 풀어서 (지금까지 읽은 바이트, 텍스트 조각) 을 차례로 돌려줌
+    # 첫 조각은 작게 읽어서 화면을 빨리 채울 수 있게 함
+    file.seek(0)
+    decompressor = zlib.decompressobj()
+    decoder = codecs.getincrementaldecoder('utf-8')('surrogatepass')
+    done = 0
+    while True:
+        data = file.read(first_size if done == 0 else size)
+        done += len(data)
+        text = decoder.decode(decompressor.decompress(data) if data else decompressor.flush(), final=not data)
+        if text:
+            yield done, text
+        if not data:
+            return
@@ -0,0 +1,258 @@
+# pyEditor_findfiles.py
+# pyEditor "파일에서 찾기" - 디렉터리 아래 파일들을 여러 프로세스로 나눠서 찾음 (Qt 와 무관)
+#   - jump2python-main/06-6 의 os.walk 방식으로 파일을 모으고 확장자/숨김 디렉터리를 거름
+#   - 앞부분 몇 바이트에 NUL 이 있으면 바이너리로 보고 건너뜀
+#   - search_files 는 파일 묶음 하나를 처리하는 함수로, 프로세스 풀에 그대로 넘겨 씀
+#   - 바꾸기는 preview_files 로 바뀔 줄을 미리 계산하고, apply_files 로 임시 파일에 쓴 뒤 바꿔치기함
+#     둘 다 replace_text 로 파일 전체를 한 번에 바꾸므로 미리 본 개수와 실제로 바꾼 개수가 같음
+#
+# 사용 예:
+#   for path, matches in find_in_files('.', 'import', extensions=['.py']):
+#       for line, column, text in matches: ...
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import multiprocessing
+
+import pyEditor_search
+import pyEditor_fileio
+
+SNIFF_SIZE = 1024
+BATCH_SIZE = 32                 # 프로세스에 한 번에 넘기는 파일 수
+MAX_MATCHES_PER_FILE = 1000
+MAX_LINE_TEXT = 200             # 결과에 담는 줄 내용 최대 길이
+SKIP_DIRS = {'__pycache__', 'node_modules', 'build', 'dist'}     # 기본값 - 파일에서 찾기 창에서 바꿀 수 있음
+
+
+def walk_files(root, extensions=None, skip_dirs=SKIP_DIRS):
+    # extensions: ['.py', '.txt'] 처럼 주면 그 확장자만, 없으면 모든 파일
+    # skip_dirs: 건너뛸 폴더 이름 (. 으로 시작하는 숨김 폴더는 항상 건너뜀)
+    for (path, dirs, files) in os.walk(root):
+        dirs[:] = [name for name in dirs if name not in skip_dirs and not name.startswith('.')]
+        for filename in files:
+            if extensions:
+                ext = os.path.splitext(filename)[-1]
+                if ext not in extensions:
+                    continue
+            yield os.path.join(path, filename)
+
+
+def is_binary(head):
+    return b'\0' in head
+
+
+def read_text(path):
+    # 바이너리면 None. 인코딩을 모르면 utf-8 로 읽고 깨진 글자는 대체 문자로 바꿈
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+        if is_binary(head):
+            return None
+        data = head + f.read()
+    return data.decode('utf-8', errors='replace')
+
+
+def search_text(text, pattern, max_matches=MAX_MATCHES_PER_FILE):
+    # [(줄 번호(0 부터), 열, 줄 내용), ...]
+    matches = []
+    line_number = 0
+    counted = 0
+
+    for match in pattern.finditer(text):
+        if match.end() == match.start():
+            continue
+        position = match.start()
+        line_number += text.count('\n', counted, position)
+        counted = position
+        line_start = text.rfind('\n', 0, position) + 1
+        line_end = text.find('\n', position)
+        if line_end < 0:
+            line_end = len(text)
+
+        matches.append((line_number, position - line_start, text[line_start:min(line_end, line_start + MAX_LINE_TEXT)]))
+        if len(matches) >= max_matches:
+            break
+    return matches
+
+
+def search_files(paths, query, regex=False, case_sensitive=False, whole_word=False):
+    # 프로세스 풀에서 실행되는 작업 단위: 파일 묶음을 찾아서 (path, matches) 목록을 돌려줌
+    pattern = pyEditor_search.compile_query(query, regex, case_sensitive, whole_word)
+    results = []
+    for path in paths:
+        try:
+            text = read_text(path)
+        except OSError:
+            continue
+        if text is None:
+            continue
+        matches = search_text(text, pattern)
+        if matches:
+            results.append((path, matches))
+    return results, len(paths)
+
+
+def run_batches(function, paths, args, workers=None, cancelled=lambda: False):
+    # paths 를 BATCH_SIZE 개씩 묶어서 function(batch, *args) 를 프로세스 풀에서 실행하고
+    # 끝나는 순서대로 결과를 돌려줌. 밀린 작업 수는 프로세스 수의 4배로 제한
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context('spawn')
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = set()
+        batch = []
+
+        def drain(block):
+            # 끝난 묶음의 결과를 돌려줌. block 이면 적어도 하나가 끝날 때까지 기다림
+            if block:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            else:
+                done = [future for future in in_flight if future.done()]
+            for future in done:
+                in_flight.discard(future)
+                yield future.result()
+
+        for path in paths:
+            if cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return
+            batch.append(path)
+            if len(batch) >= BATCH_SIZE:
+                in_flight.add(pool.submit(function, batch, *args))
+                batch = []
+                yield from drain(len(in_flight) >= workers * 4)
+
+        if batch:
+            in_flight.add(pool.submit(function, batch, *args))
+
+        while in_flight:
+            if cancelled():
+                pool.shutdown(wait=False, cancel_futures=True)
+                return
+            yield from drain(True)
+
+
+def find_in_files(root, query, regex=False, case_sensitive=False, whole_word=False, extensions=None,
+                  workers=None, cancelled=lambda: False, skip_dirs=SKIP_DIRS):
+    # 파일 묶음을 프로세스 풀에 나눠 주고, 끝나는 대로 (path, matches) 를 하나씩 돌려줌
+    # 묶음 하나가 끝날 때마다 진행 상황으로 (None, 그 묶음의 파일 수) 도 돌려줌
+    options = (query, regex, case_sensitive, whole_word)
+    for results, scanned in run_batches(search_files, walk_files(root, extensions, skip_dirs), options, workers,
+                                        cancelled):
+        yield from results
+        yield None, scanned
+
+
+def make_replacer(replacement, regex=False):
+    # 정규식이면 \1 같은 그룹 참조를 쓰고, 아니면 바꿀 내용을 글자 그대로 씀
+    if regex:
+        return lambda match: match.expand(replacement)
+    return lambda match: replacement
+
+
+def read_exact(path):
+    # 바꾸기용 읽기 - 깨진 글자가 있으면 UnicodeDecodeError (대체 문자로 덮어쓰지 않도록)
+    # 줄바꿈은 바꾸지 않고 그대로 둠 (\r\n 과 \n 이 섞인 파일도 바꾼 곳 말고는 바이트가 같게)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if is_binary(data[:SNIFF_SIZE]):
+        return None
+    return data.decode('utf-8')
+
+
+def replace_text(text, pattern, replacer):
+    # 텍스트 전체를 한 번에 바꿈 (줄을 넘는 일치도 그대로). 반환값: (새 텍스트, [(시작, 끝, 바뀐 길이), ...])
+    spans = []
+
+    def replace(match):
+        new = replacer(match)
+        spans.append((match.start(), match.end(), len(new)))
+        return new
+
+    return pattern.sub(replace, text), spans
+
+
+def preview_changes(text, new_text, spans):
+    # 바뀐 곳이 있는 줄마다 (줄 번호, 원래 줄, 바뀐 줄)
+    # 일치가 줄바꿈을 넘거나 한 줄에 여러 개면 걸친 줄을 한 항목으로 묶음
+    changes = []
+    line_number = 0
+    counted = 0
+    group = None    # [원래 줄 시작, 원래 줄 끝, 새 텍스트에서의 줄 시작]
+    shift = 0       # 지금까지 바꾼 일치로 늘어난 길이
+
+    def flush():
+        start, end, new_start = group
+        changes.append((line_number, text[start:end][:MAX_LINE_TEXT],
+                        new_text[new_start:end + shift][:MAX_LINE_TEXT]))
+
+    for start, end, length in spans:
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', end)
+        if line_end < 0:
+            line_end = len(text)
+
+        if group is not None and line_start <= group[1]:
+            group[1] = max(group[1], line_end)
+        else:
+            if group is not None:
+                flush()
+            line_number += text.count('\n', counted, line_start)
+            counted = line_start
+            group = [line_start, line_end, line_start + shift]
+        shift += length - (end - start)
+
+    if group is not None:
+        flush()
+    return changes
+
+
+def preview_files(paths, query, replacement, regex=False, case_sensitive=False, whole_word=False):
+    # 작업 단위: ([(path, mtime_ns, size, 바꿀 개수, [(줄 번호, 원래 줄, 바뀐 줄), ...]), ...],
+    #             [(읽지 못해 건너뛴 path, 이유), ...], 훑은 파일 수)
+    pattern = pyEditor_search.compile_query(query, regex, case_sensitive, whole_word)
+    replacer = make_replacer(replacement, regex)
+    results = []
+    skipped = []
+
+    for path in paths:
+        try:
+            st = os.stat(path)
+            text = read_exact(path)
+        except UnicodeDecodeError:
+            skipped.append((path, 'utf-8 이 아니라서 건너뜀'))
+            continue
+        except OSError as e:
+            skipped.append((path, str(e)))
+            continue
+        if text is None or not pattern.search(text):
+            continue
+
+        new_text, spans = replace_text(text, pattern, replacer)
+        if spans:
+            results.append((path, st.st_mtime_ns, st.st_size, len(spans), preview_changes(text, new_text, spans)))
+    return results, skipped, len(paths)
+
+
+def apply_files(items, query, replacement, regex=False, case_sensitive=False, whole_word=False):
+    # 작업 단위: items = [(path, mtime_ns, size), ...] (미리 보기 때의 파일 상태)
+    # 미리 본 뒤에 바뀐 파일은 건너뜀. 반환값: ([(path, 바꾼 개수, 오류 메시지 또는 None), ...], 파일 수)
+    pattern = pyEditor_search.compile_query(query, regex, case_sensitive, whole_word)
+    replacer = make_replacer(replacement, regex)
+    results = []
+
+    for path, mtime, size in items:
+        try:
+            st = os.stat(path)
+            if st.st_mtime_ns != mtime or st.st_size != size:
+                results.append((path, 0, '미리 보기 후 파일이 바뀜'))
+                continue
+            text = read_exact(path)
+            if text is None:
+                continue
+            new_text, spans = replace_text(text, pattern, replacer)
+            if spans:
+                pyEditor_fileio.atomic_write(path, [new_text], newline='')
+            results.append((path, len(spans), None))
+        except (OSError, UnicodeError) as e:
+            results.append((path, 0, str(e)))
+    return results, len(items)
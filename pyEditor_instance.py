@@ -0,0 +1,142 @@
+# pyEditor_instance.py
+# pyEditor 한 번만 실행 모드 - 이미 떠 있는 편집기가 있으면 파일 목록만 넘기고 바로 끝냄 (Qt 와 무관)
+#   - Qt 를 import 하지 않으므로 PyQt 초기화 없이 몇 ms 안에 끝남 (json/tempfile 같은 모듈도 쓰지 않음)
+#   - 받는 쪽은 pyEditor_Qt5_Ver014.InstanceServer (QLocalServer)
+#     리눅스/맥은 유닉스 도메인 소켓, 윈도우는 이름 있는 파이프 (QLocalServer 와 같은 이름을 씀)
+#   - 주고받는 내용: 절대 경로마다 뒤에 NUL 을 붙여 보내고 줄바꿈으로 끝내면 'ok' 한 줄로 답함
+#     (경로에는 줄바꿈이 들어갈 수 있지만 NUL 은 못 들어가고, 절대 경로는 줄바꿈으로 시작하지 않음)
+#
+# 사용 예:
+#   python pyEditor_Qt5_Ver014.py a.txt b.py        (떠 있는 편집기에 두 파일을 탭으로 엶)
+#   python pyEditor_Qt5_Ver014.py --new-instance    (떠 있어도 새 편집기를 띄움)
+
+import os
+import sys
+
+NEW_INSTANCE_OPTION = '--new-instance'
+CONNECT_TIMEOUT = 0.5
+REPLY_TIMEOUT = 2.0
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+
+def server_name():
+    # 사용자마다 하나. 유닉스는 QLocalServer 에 전체 경로를 넘겨서 양쪽이 같은 소켓 파일을 씀
+    # 안전한 디렉터리를 쓸 수 없으면 None (한 번만 실행 모드를 쓰지 않음)
+    if sys.platform == 'win32':
+        return 'pyEditor-' + os.environ.get('USERNAME', 'user')
+    directory = os.environ.get('XDG_RUNTIME_DIR') or private_directory()
+    if directory is None:
+        return None
+    return os.path.join(directory, f'pyEditor-{os.getuid()}.sock')
+
+
+def private_directory():
+    # XDG_RUNTIME_DIR 이 없을 때 - /tmp 는 모든 사용자가 같이 쓰므로 /tmp 에 바로 소켓을 만들면
+    # 다른 사용자가 같은 이름의 소켓을 먼저 만들어 경로를 가로챌 수 있음
+    # 그래서 나만 쓸 수 있는(0700) 디렉터리를 만들고, 이미 있으면 내 것이고 남이 못 쓰는지 확인함
+    import stat
+    import tempfile
+    directory = os.path.join(tempfile.gettempdir(), f'pyEditor-{os.getuid()}')
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    try:
+        st = os.lstat(directory)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        return None
+    return directory
+
+
+def file_arguments(argv):
+    # 옵션(- 로 시작)을 뺀 나머지가 열 파일
+    return [arg for arg in argv if not arg.startswith('-')]
+
+
+def encode_message(paths):
+    # 받는 쪽의 작업 디렉터리는 다르므로 절대 경로로 바꿔서 보냄
+    text = ''.join(os.path.abspath(path) + '\0' for path in paths) + '\n'
+    return text.encode('utf-8', 'surrogateescape')
+
+
+def message_end(buffer):
+    # 메시지가 다 왔으면 끝(줄바꿈) 위치, 아니면 -1
+    if buffer[:1] == b'\n':
+        return 0
+    end = buffer.find(b'\0\n')
+    return end + 1 if end >= 0 else -1
+
+
+def decode_message(data):
+    # 줄바꿈 앞까지 받은 내용 -> 경로 목록
+    text = data.decode('utf-8', 'surrogateescape')
+    return text.split('\0')[:-1]
+
+
+def read_reply(read):
+    reply = b''
+    while not reply.endswith(b'\n') and len(reply) < 64:
+        data = read(64)
+        if not data:
+            break
+        reply += data
+    return reply.strip() == b'ok'
+
+
+def send_socket(message):
+    # 소켓 파일이 없으면 떠 있는 편집기도 없음 (처음 실행할 때는 socket 모듈도 불러오지 않음)
+    path = server_name()
+    if path is None or not os.path.exists(path):
+        return False
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        sock.settimeout(REPLY_TIMEOUT)
+        sock.sendall(message)
+        return read_reply(sock.recv)
+
+
+def is_stale_socket(path):
+    # 소켓 파일은 있는데 연결하면 거절당함 - 비정상 종료한 편집기가 남긴 것이라 지워도 됨
+    # 떠 있는 편집기가 바쁘거나(답을 못 받음) 막 뜨는 중이면 연결은 되므로 False
+    if sys.platform == 'win32':
+        return False    # 이름 있는 파이프는 프로세스가 끝나면 사라짐
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            return True
+        except OSError:
+            return False
+    return False
+
+
+def send_pipe(message):
+    with open('\\\\.\\pipe\\' + server_name(), 'r+b', buffering=0) as pipe:
+        pipe.write(message)
+        return read_reply(pipe.read)
+
+
+def send_files(paths):
+    # 떠 있는 편집기가 받았으면 True. 없거나 답이 없으면 False (이 프로세스가 직접 편집기를 띄움)
+    message = encode_message(paths)
+    try:
+        if sys.platform == 'win32':
+            return send_pipe(message)
+        return send_socket(message)
+    except OSError:
+        return False
+
+
+def handoff(argv):
+    # --multiprocessing-fork 는 PyInstaller 빌드에서 프로세스 풀이 띄운 작업 프로세스
+    if NEW_INSTANCE_OPTION in argv or any(arg.startswith('--multiprocessing') for arg in argv):
+        return False
+    return send_files(file_arguments(argv))
@@ -0,0 +1,361 @@
+# pyEditor_journal.py
+# 저장하지 않은 탭을 위한 자동 저장 기록 (Qt 와 무관)
+#   - 실행할 때마다 기록 파일(session-*.log) 하나에 편집 내용(위치, 지운 길이, 넣은 텍스트)만 덧붙임
+#     문서 전체를 다시 쓰지 않으므로 비용은 편집 크기에 비례
+#   - 파일에서 불러온 탭은 (경로, mtime, 크기) 를 기준으로 삼고, 새 탭이나 편집이 많이 쌓인 탭은
+#     가끔 전체 텍스트를 조각으로 나눠 체크포인트로 씀
+#   - 실제 쓰기는 작업 스레드에서 함 (GUI 는 큐에 넣기만 함)
+#   - 쓰다가 실패하면 error 에 남기고 이후 기록은 버림 - GUI 가 restart() 뒤에 모든 탭의 기준을 다시 넣으면
+#     기록 파일을 비우고 처음부터 다시 씀
+#   - 쓸모없어진 기록이 많아지면 살아 있는 탭의 기록만 새 파일로 복사해서 줄임
+#   - 정상 종료하면 기록 파일을 지우고, 비정상 종료로 남은 파일은 다음 실행 때 recover() 로 되살림
+#     (실행 중인 다른 pyEditor 의 기록은 잠금 파일로 구분해서 건드리지 않음)
+#
+# 레코드 형식: 헤더(종류 1바이트, 탭 번호, 길이, crc32) + marshal 로 만든 내용
+#   끝부분이 잘리거나 깨진 레코드를 만나면 거기서 읽기를 멈춤
+#
+# 사용 예:
+#   journal = Journal()
+#   journal.file_base(1, 'a.py', 'utf-8', '\n', mtime_ns, size)
+#   journal.delta(1, 10, 0, 'hello')
+#   ...
+#   for tab in recover(): print(tab.path, len(tab.text))
+
+import glob
+import marshal
+import os
+import queue
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+import pyEditor_piecetable
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+JOURNAL_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pyEditor', 'journal')
+
+HEADER = struct.Struct('<BIII')     # 종류, 탭 번호, 내용 길이, crc32
+
+FILE_BASE = 1       # (path, encoding, newline, mtime_ns, size) - 디스크 파일과 같은 상태
+TEXT_BEGIN = 2      # (path, encoding, newline, modified) - 체크포인트 시작 (modified: 기준 텍스트에 저장하지 않은 수정이 있음)
+TEXT_CHUNK = 3      # 텍스트 조각
+TEXT_END = 4        # 체크포인트 끝 (이게 있어야 체크포인트가 유효)
+DELTA = 5           # (position, removed_length, added_text)
+CLOSE = 6           # 탭을 닫음
+RESTART = 7         # (큐에만 넣음) 실패한 뒤 기록 파일을 비우고 다시 시작
+
+CHUNK_SIZE = 1024 * 1024
+FSYNC_SECONDS = 1.0             # 이 간격으로만 fsync
+CHECKPOINT_BYTES = 4 * 1024 * 1024  # 기준 이후 편집이 이만큼 쌓이면 체크포인트를 권함
+CHECKPOINT_DELTAS = 20000
+COMPACT_MIN_SIZE = 16 * 1024 * 1024  # 기록 파일이 이보다 크고 살아 있는 기록의 두 배를 넘으면 줄임
+
+
+def lock(file):
+    # 잠그면 True, 다른 프로세스가 잠그고 있으면 False
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def pack(kind, tab_id, value):
+    data = marshal.dumps(value)
+    return HEADER.pack(kind, tab_id, len(data), zlib.crc32(data)) + data
+
+
+def read_records(file):
+    # (종류, 탭 번호, 내용, 레코드 시작 위치, 레코드 길이) 를 차례대로 - 깨진 곳에서 멈춤
+    offset = 0
+    while True:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        kind, tab_id, length, crc = HEADER.unpack(header)
+        data = file.read(length)
+        if len(data) < length or zlib.crc32(data) != crc:
+            return
+        try:
+            value = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            return
+        yield kind, tab_id, value, offset, HEADER.size + length
+        offset += HEADER.size + length
+
+
+class TabLog:
+    # 기록 파일 안에서 탭 하나의 유효한 레코드 위치 (마지막 기준 레코드부터)
+    __slots__ = ('ranges', 'live', 'delta_bytes', 'deltas')
+
+    def __init__(self):
+        self.ranges = []        # [(offset, length), ...]
+        self.live = 0           # ranges 의 바이트 합
+        self.delta_bytes = 0    # 기준 이후 편집 크기
+        self.deltas = 0
+
+
+class Journal:
+    def __init__(self, directory=JOURNAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=f'session-{os.getpid()}-', suffix='.log', dir=directory)
+        self.lock_path = self.path[:-len('.log')] + '.lock'
+
+        # 세션이 살아 있는 동안 잠금 파일을 잡고 있어서 다른 프로세스가 복구하지 않게 함
+        self.lock_file = open(self.lock_path, 'wb')
+        lock(self.lock_file)
+        self.file = open(fd, 'wb')
+
+        self.tabs = {}          # 탭 번호 -> TabLog (작업 스레드에서만 고침)
+        self.error = None       # 쓰다가 실패하면 그 메시지 (restart 전까지 기록은 버림)
+        self.queue = queue.Queue()
+        self.last_sync = time.monotonic()
+        self.thread = threading.Thread(target=self.run, name='pyEditor-journal', daemon=True)
+        self.thread.start()
+
+    # ---- GUI 스레드에서 부르는 함수 (큐에 넣기만 함) ----
+
+    def file_base(self, tab_id, path, encoding, newline, mtime, size):
+        self.queue.put((FILE_BASE, tab_id, (path, encoding, newline, mtime, size)))
+
+    def text_base(self, tab_id, path, encoding, newline, snapshot, modified=False):
+        # snapshot: PieceTable.snapshot() - 조각 목록만 복사된 것이라 다른 스레드에서 읽어도 안전
+        # modified 면 뒤에 편집이 없어도 복구함 (체크포인트, 복구한 탭, 다시 시작한 기록)
+        self.queue.put((TEXT_BEGIN, tab_id, (path, encoding, newline, modified, snapshot)))
+
+    def delta(self, tab_id, position, removed, added):
+        self.queue.put((DELTA, tab_id, (position, removed, added)))
+
+    def close_tab(self, tab_id):
+        self.queue.put((CLOSE, tab_id, None))
+
+    def restart(self):
+        # 실패한 뒤 다시 시도 - 이전 기록은 중간이 빠졌을 수 있으므로 부른 쪽이 바로 뒤에 모든 탭의 기준을 다시 넣어야 함
+        self.queue.put((RESTART, 0, None))
+
+    def needs_checkpoint(self, tab_id):
+        tab = self.tabs.get(tab_id)
+        return tab is not None and (tab.delta_bytes > CHECKPOINT_BYTES or tab.deltas > CHECKPOINT_DELTAS)
+
+    def close(self, remove=True):
+        # 정상 종료 - 남은 기록을 다 쓰고, remove 면 파일을 지움
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        if remove:
+            for path in (self.path, self.lock_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        self.lock_file.close()
+
+    # ---- 작업 스레드 ----
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            items = [item]
+            # 쌓여 있는 것을 한꺼번에 쓰고 flush 는 한 번만
+            while item is not None and not self.queue.empty():
+                item = self.queue.get()
+                items.append(item)
+
+            try:
+                self.write_items(items)
+            except OSError as e:
+                self.error = str(e)
+            if items[-1] is None:
+                return
+
+    def write_items(self, items):
+        for item in items:
+            if item is None:
+                break
+            if item[0] == RESTART:
+                self.reopen()
+            elif self.error is None:
+                try:
+                    self.write(*item)
+                except OSError as e:
+                    self.error = str(e)
+        if self.error is not None:
+            return
+        self.file.flush()
+
+        now = time.monotonic()
+        if items[-1] is None or now - self.last_sync > FSYNC_SECONDS:
+            os.fsync(self.file.fileno())
+            self.last_sync = now
+        if items[-1] is not None:
+            self.compact_if_needed()
+
+    def reopen(self):
+        # 기록 파일을 비우고 처음부터 씀 (잠금 파일은 그대로)
+        try:
+            self.file.close()
+        except OSError:
+            pass    # 버퍼에 남은 내용을 쓰다 실패해도 어차피 버림
+        self.tabs.clear()
+        self.file = open(self.path, 'wb')
+        self.last_sync = time.monotonic()
+        self.error = None
+
+    def append(self, kind, tab_id, value):
+        data = pack(kind, tab_id, value)
+        offset = self.file.tell()
+        self.file.write(data)
+        return offset, len(data)
+
+    def write(self, kind, tab_id, value):
+        tab = self.tabs.get(tab_id)
+        if tab is None:
+            tab = self.tabs[tab_id] = TabLog()
+
+        if kind == CLOSE:
+            self.append(CLOSE, tab_id, None)
+            del self.tabs[tab_id]
+        elif kind == FILE_BASE:
+            self.reset(tab, [self.append(FILE_BASE, tab_id, value)])
+        elif kind == TEXT_BEGIN:
+            path, encoding, newline, modified, snapshot = value
+            ranges = [self.append(TEXT_BEGIN, tab_id, (path, encoding, newline, modified))]
+            for chunk in snapshot.chunks(max_size=CHUNK_SIZE):
+                ranges.append(self.append(TEXT_CHUNK, tab_id, chunk))
+            ranges.append(self.append(TEXT_END, tab_id, None))
+            self.reset(tab, ranges)
+        else:
+            offset, length = self.append(DELTA, tab_id, value)
+            tab.ranges.append((offset, length))
+            tab.live += length
+            tab.delta_bytes += len(value[2]) + 16
+            tab.deltas += 1
+
+    @staticmethod
+    def reset(tab, ranges):
+        tab.ranges = ranges
+        tab.live = sum(length for _, length in ranges)
+        tab.delta_bytes = 0
+        tab.deltas = 0
+
+    def compact_if_needed(self):
+        size = self.file.tell()
+        live = sum(tab.live for tab in self.tabs.values())
+        if size < COMPACT_MIN_SIZE or size < 2 * live:
+            return
+
+        # 살아 있는 탭의 레코드만 새 파일로 복사한 뒤 바꿔치기
+        temp_path = self.path + '.tmp'
+        with open(self.path, 'rb') as old, open(temp_path, 'wb') as new:
+            for tab in self.tabs.values():
+                ranges = []
+                for offset, length in tab.ranges:
+                    old.seek(offset)
+                    ranges.append((new.tell(), length))
+                    new.write(old.read(length))
+                tab.ranges = ranges
+            new.flush()
+            os.fsync(new.fileno())
+        self.file.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, 'ab')
+        self.last_sync = time.monotonic()
+
+
+class RecoveredTab:
+    __slots__ = ('path', 'encoding', 'newline', 'text')
+
+    def __init__(self, path, encoding, newline, text):
+        self.path = path
+        self.encoding = encoding
+        self.newline = newline
+        self.text = text
+
+
+def replay(path):
+    # 기록 파일 하나를 읽어서, 기준 이후에 편집이 있었거나 기준 텍스트가 수정된 탭만 RecoveredTab 목록으로 돌려줌
+    tabs = {}       # 탭 번호 -> [기준 정보, 기준 텍스트 또는 None, 편집 목록, 진행 중인 체크포인트]
+
+    with open(path, 'rb') as file:
+        for kind, tab_id, value, offset, length in read_records(file):
+            tab = tabs.setdefault(tab_id, [None, None, [], None])
+            if kind == FILE_BASE:
+                tab[:] = [value, None, [], None]
+            elif kind == TEXT_BEGIN:
+                tab[3] = (value, [])
+            elif kind == TEXT_CHUNK and tab[3] is not None:
+                tab[3][1].append(value)
+            elif kind == TEXT_END and tab[3] is not None:
+                info, chunks = tab[3]
+                tab[:] = [info, ''.join(chunks), [], None]
+            elif kind == DELTA:
+                tab[2].append(value)
+            elif kind == CLOSE:
+                tabs.pop(tab_id, None)
+
+    recovered = []
+    for info, text, deltas, _ in tabs.values():
+        modified = text is not None and len(info) > 3 and info[3]
+        if info is None or not (deltas or modified):
+            continue
+        if text is None:
+            # 파일 기준 - 디스크 파일이 그때와 같아야 편집을 다시 적용할 수 있음
+            file_path, encoding, newline, mtime, size = info
+            try:
+                st = os.stat(file_path)
+                if st.st_mtime_ns != mtime or st.st_size != size:
+                    continue
+                with open(file_path, encoding=encoding, newline=None) as f:
+                    text = f.read()
+            except (OSError, UnicodeError, LookupError):
+                continue
+        else:
+            file_path, encoding, newline = info[:3]
+
+        table = pyEditor_piecetable.PieceTable(text)
+        for position, removed, added in deltas:
+            table.replace(position, removed, added)
+        result = table.text()
+        if result != text or modified:     # 편집했다가 되돌린 탭은 복구할 것이 없음
+            recovered.append(RecoveredTab(file_path, encoding, newline, result))
+    return recovered
+
+
+def recover(directory=JOURNAL_DIR):
+    # 비정상 종료로 남은 기록 파일을 모두 읽어서 되살릴 탭 목록을 돌려주고 파일은 지움
+    recovered = []
+    for path in sorted(glob.glob(os.path.join(directory, 'session-*.log'))):
+        lock_path = path[:-len('.log')] + '.lock'
+        try:
+            lock_file = open(lock_path, 'ab')
+        except OSError:
+            continue
+        try:
+            if not lock(lock_file):
+                continue    # 실행 중인 다른 pyEditor 의 기록
+            try:
+                recovered.extend(replay(path))
+            except OSError:
+                continue
+            for name in (path, path + '.tmp'):
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+        finally:
+            lock_file.close()
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+    return recovered
@@ -0,0 +1,258 @@
+# pyEditor_piecetable.py
+# pyEditor 편집 버퍼 - Qt 와 무관한 piece table
+#   - 원본 텍스트와 추가된 텍스트는 한 번 만들면 바뀌지 않는 문자열(buffers)로 보관
+#   - 문서는 (buffer 번호, 시작, 길이) 조각(piece) 목록으로만 표현
+#   - 삽입/삭제는 조각 목록만 고치므로 파일 크기와 상관없이 편집 크기에 비례
+#   - snapshot() 은 조각 목록만 복사 - 저장/검색은 스냅샷에서 텍스트 복사 없이 진행
+#   - 줄 색인: 버퍼마다 줄바꿈 위치 array 를 처음 쓸 때 한 번 만들고 (버퍼는 바뀌지 않으므로 그대로 유지)
+#     조각의 줄바꿈 수는 그 array 에서 이분 탐색 - 편집 뒤에는 바뀐 조각부터 누적값만 다시 계산
+#
+# 사용 예:
+#   table = PieceTable("hello\nworld\n")
+#   table.insert(5, ", python")
+#   snap = table.snapshot()
+#   for chunk in snap.chunks(): ...
+#   table.line_start(1)     # 두 번째 줄이 시작하는 위치
+
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+NEWLINE_RE = re.compile('\n')
+
+
+class PieceReader:
+    # PieceTable 과 Snapshot 이 같이 쓰는 읽기 기능
+    # self.buffers: 문자열 목록, self.pieces: (buf, start, length) 목록
+    # self.starts: 각 조각 앞까지의 글자 수 누적값
+
+    def __len__(self):
+        return self.length
+
+    def locate(self, offset):
+        # offset 이 들어 있는 조각 번호와 조각 안에서의 위치
+        self.update_prefix()
+        index = bisect_right(self.starts, offset, 0, len(self.pieces)) - 1
+        return index, offset - self.starts[index]
+
+    def update_prefix(self):
+        pass
+
+    def chunks(self, start=0, end=None, max_size=None):
+        # start~end 구간을 조각 단위 문자열로 차례대로 돌려줌 (전체를 합치지 않음)
+        # max_size 를 주면 큰 조각도 그 길이 이하로 잘라서 돌려줌
+        if end is None or end > self.length:
+            end = self.length
+        if start >= end:
+            return
+
+        index, skip = self.locate(start)
+        remaining = end - start
+        buffers = self.buffers
+        pieces = self.pieces
+
+        while remaining > 0:
+            buf, piece_start, length = pieces[index]
+            take = min(length - skip, remaining)
+            begin = piece_start + skip
+            if max_size is None:
+                yield buffers[buf][begin:begin + take]
+            else:
+                for pos in range(begin, begin + take, max_size):
+                    yield buffers[buf][pos:min(pos + max_size, begin + take)]
+            remaining -= take
+            skip = 0
+            index += 1
+
+    def text(self, start=0, end=None):
+        return ''.join(self.chunks(start, end))
+
+
+class Snapshot(PieceReader):
+    # 특정 시점의 읽기 전용 문서 (buffers 는 공유, 조각 목록만 복사)
+    def __init__(self, buffers, pieces, starts, length):
+        self.buffers = buffers
+        self.pieces = pieces
+        self.starts = starts
+        self.length = length
+
+
+class PieceTable(PieceReader):
+    COALESCE_LIMIT = 4096   # 이 길이까지만 연속 입력을 한 버퍼에 이어 붙임
+
+    def __init__(self, text=''):
+        self.buffers = [text]
+        self.pieces = [(0, 0, len(text))] if text else []
+        self.starts = []
+        self.length = len(text)
+        self.dirty_from = 0     # 이 조각부터 누적값을 다시 계산해야 함
+
+        # 줄 색인: 버퍼 번호 -> (줄바꿈 위치 array, 훑은 길이), 조각 앞까지의 줄바꿈 수 누적값
+        self.breaks = {}
+        self.lines = []
+        self.lines_from = 0
+
+        # 대략적인 메모리 (바이트) - 지운 텍스트도 버퍼에 남으므로 지금 문서보다 클 수 있음
+        self.memory = sys.getsizeof(text)
+
+        # 연속 입력을 한 조각으로 합치기 위한 마지막 삽입 정보
+        self.last_insert_end = -1
+
+    def update_prefix(self):
+        # 바뀐 조각 뒤쪽만 누적값을 다시 계산
+        count = len(self.pieces)
+        if self.dirty_from >= count and len(self.starts) == count:
+            return
+
+        index = min(self.dirty_from, count)
+        del self.starts[index:]
+
+        if index:
+            buf, start, length = self.pieces[index - 1]
+            offset = self.starts[index - 1] + length
+        else:
+            offset = 0
+
+        for buf, start, length in self.pieces[index:]:
+            self.starts.append(offset)
+            offset += length
+
+        self.dirty_from = count
+
+    def mark_dirty(self, index):
+        self.dirty_from = min(self.dirty_from, index)
+        self.lines_from = min(self.lines_from, index)
+
+    def buffer_breaks(self, buf):
+        # buf 번 버퍼의 줄바꿈 위치 (연속 입력으로 버퍼가 늘었으면 늘어난 부분만 더 찾음)
+        text = self.buffers[buf]
+        breaks, scanned = self.breaks.get(buf, (None, 0))
+        if breaks is None or scanned < len(text):
+            found = array('q', [match.start() for match in NEWLINE_RE.finditer(text, scanned)])
+            if breaks is None:
+                breaks = found
+            else:
+                breaks.extend(found)
+            self.memory += len(found) * found.itemsize
+            self.breaks[buf] = (breaks, len(text))
+        return breaks
+
+    def piece_breaks(self, index):
+        # index 번 조각의 줄바꿈들이 버퍼 줄바꿈 array 의 어디부터 어디까지인지
+        buf, start, length = self.pieces[index]
+        breaks = self.buffer_breaks(buf)
+        return breaks, bisect_left(breaks, start), bisect_left(breaks, start + length)
+
+    def update_lines(self):
+        count = len(self.pieces)
+        if self.lines_from >= count and len(self.lines) == count:
+            return
+
+        index = min(self.lines_from, count)
+        del self.lines[index:]
+
+        if index:
+            breaks, first, last = self.piece_breaks(index - 1)
+            line = self.lines[index - 1] + last - first
+        else:
+            line = 0
+
+        for i in range(index, count):
+            self.lines.append(line)
+            breaks, first, last = self.piece_breaks(i)
+            line += last - first
+
+        self.lines_from = count
+
+    def line_count(self):
+        self.update_lines()
+        if not self.pieces:
+            return 1
+        breaks, first, last = self.piece_breaks(len(self.pieces) - 1)
+        return self.lines[-1] + last - first + 1
+
+    def line_start(self, number):
+        # number 번째 줄(0 부터)이 시작하는 글자 위치 (줄 수보다 크면 마지막 줄)
+        number = min(number, self.line_count() - 1)
+        if number <= 0:
+            return 0
+        self.update_prefix()
+
+        # number 번째 줄은 (number - 1) 번째 줄바꿈 바로 뒤에서 시작
+        index = bisect_right(self.lines, number - 1) - 1
+        breaks, first, last = self.piece_breaks(index)
+        buf, start, length = self.pieces[index]
+        return self.starts[index] + breaks[first + number - 1 - self.lines[index]] - start + 1
+
+    def line(self, number):
+        start = self.line_start(number)
+        if number + 1 >= self.line_count():
+            return self.text(start)
+        return self.text(start, self.line_start(number + 1) - 1)
+
+    def split(self, offset):
+        # offset 위치에서 조각을 나누고, offset 에서 시작하는 조각 번호를 돌려줌
+        if offset >= self.length:
+            return len(self.pieces)
+
+        index, inner = self.locate(offset)
+        if inner == 0:
+            return index
+
+        buf, start, length = self.pieces[index]
+        self.pieces[index:index + 1] = [(buf, start, inner), (buf, start + inner, length - inner)]
+        self.mark_dirty(index)
+        return index + 1
+
+    def insert(self, offset, text):
+        if not text:
+            return
+        offset = max(0, min(offset, self.length))
+
+        # 바로 앞 삽입의 끝에 이어서 입력하면 마지막 추가 버퍼와 조각을 늘림
+        if offset == self.last_insert_end and self.pieces:
+            index, inner = self.locate(offset - 1)
+            buf, start, length = self.pieces[index]
+            if (buf == len(self.buffers) - 1 and inner == length - 1 and start + length == len(self.buffers[buf])
+                    and len(self.buffers[buf]) + len(text) <= self.COALESCE_LIMIT):
+                self.memory -= sys.getsizeof(self.buffers[buf])
+                self.buffers[buf] += text
+                self.memory += sys.getsizeof(self.buffers[buf])
+                self.pieces[index] = (buf, start, length + len(text))
+                self.mark_dirty(index + 1)
+                self.length += len(text)
+                self.last_insert_end = offset + len(text)
+                return
+
+        index = self.split(offset)
+        self.buffers.append(text)
+        self.memory += sys.getsizeof(text)
+        self.pieces.insert(index, (len(self.buffers) - 1, 0, len(text)))
+        self.mark_dirty(index)
+        self.length += len(text)
+        self.last_insert_end = offset + len(text)
+
+    def delete(self, offset, length):
+        offset = max(0, offset)
+        length = min(length, self.length - offset)
+        if length <= 0:
+            return
+
+        first = self.split(offset)
+        last = self.split(offset + length)
+        del self.pieces[first:last]
+        self.mark_dirty(first)
+        self.length -= length
+        self.last_insert_end = -1
+
+    def replace(self, offset, length, text):
+        self.delete(offset, length)
+        self.insert(offset, text)
+
+    def snapshot(self):
+        # 조각 목록과 누적값만 복사 - 텍스트 문자열 자체는 공유
+        # (연속 입력은 buffers 의 마지막 문자열을 새 문자열로 바꾸므로 buffers 목록도 복사)
+        self.update_prefix()
+        self.last_insert_end = -1
+        return Snapshot(list(self.buffers), tuple(self.pieces), list(self.starts), self.length)
@@ -0,0 +1,176 @@
+# pyEditor_search.py
+# pyEditor 찾기용 트라이그램(3글자) 색인 - Qt 와 무관
+#   - 줄(블록)마다 정수 id 를 받아서, 그 줄에 들어 있는 3글자 조각 -> id 목록을 보관
+#   - 찾을 때는 가장 드문 조각 몇 개의 id 목록만 교집합해서 후보 줄을 고르고,
+#     실제 일치 여부는 호출하는 쪽에서 줄 텍스트로 확인함
+#   - 줄이 바뀌면 새 조각만 추가하고 옛 항목은 남겨 둠 (후보가 늘 뿐 빠지는 일은 없음)
+#     쌓인 옛 항목이 많아지면 needs_rebuild() 가 True 가 되어 다시 만들면 됨
+#
+# 사용 예:
+#   index = TrigramIndex()
+#   index.add(1, "print('hello')")
+#   index.candidates("hell")   -> {1}
+#
+# 정규식/대소문자/단어 단위 검색은 compile_query 로 패턴을 만들고(캐시됨),
+# search_slices 로 스냅샷을 줄 경계에 맞춘 조각 단위로 훑음 (작업 스레드에서 사용)
+# search_lines 는 같은 방식으로 훑으면서 결과 목록용 (줄, 열, 길이) 를 array 로 모아 줌
+
+import re
+from array import array
+from functools import lru_cache
+
+GRAM = 3
+
+
+def trigrams(text):
+    # 대소문자 구분 없이 찾을 수 있도록 소문자로 바꿔서 조각을 만듦
+    text = text.lower()
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class TrigramIndex:
+    MAX_INTERSECT = 3       # 교집합에 쓰는 조각 수 (나머지는 확인 단계에서 걸러짐)
+
+    def __init__(self):
+        self.postings = {}      # 3글자 조각 -> array('l') id 목록
+        self.live = 0           # 지금 색인에 올라가 있는 줄 수
+        self.stale = 0          # 바뀌어서 옛 항목이 남아 있는 줄 수
+
+    def clear(self):
+        self.postings = {}
+        self.live = 0
+        self.stale = 0
+
+    def add(self, line_id, text, replacing=False):
+        # replacing: 이미 색인된 줄을 새 텍스트로 다시 넣는 경우
+        postings = self.postings
+        for gram in trigrams(text):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = array('l', (line_id,))
+            elif ids[-1] != line_id:
+                ids.append(line_id)
+
+        if replacing:
+            self.stale += 1
+        else:
+            self.live += 1
+
+    def needs_rebuild(self):
+        return self.stale > max(1024, self.live)
+
+    def candidates(self, query):
+        # query 가 들어 있을 수 있는 줄 id 집합, 조각이 없으면(3글자 미만) None
+        grams = trigrams(query)
+        if not grams:
+            return None
+
+        lists = []
+        for gram in grams:
+            ids = self.postings.get(gram)
+            if ids is None:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+
+        result = set(lists[0])
+        for ids in lists[1:self.MAX_INTERSECT]:
+            if len(result) < 64:
+                break
+            result.intersection_update(ids)
+        return result
+
+
+def find_in_line(text, query, case_sensitive=False):
+    # 한 줄에서 query 가 나오는 모든 열 위치 (겹치지 않게)
+    if case_sensitive:
+        columns = []
+        column = text.find(query)
+        while column >= 0:
+            columns.append(column)
+            column = text.find(query, column + len(query))
+        return columns
+
+    # 소문자로 바꾸면 길이가 달라지는 글자가 있어서 ('İ' -> 'i̇') 원래 텍스트에서 대소문자 무시로 찾음
+    return [match.start() for match in compile_query(query).finditer(text)]
+
+
+@lru_cache(maxsize=64)
+def compile_query(query, regex=False, case_sensitive=False, whole_word=False):
+    # 검색 옵션을 정규식 하나로 만듦. 잘못된 정규식이면 re.error 발생
+    pattern = query if regex else re.escape(query)
+    if whole_word:
+        pattern = r'\b(?:' + pattern + r')\b'
+
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+SLICE_SIZE = 256 * 1024
+
+
+def search_slices(reader, pattern, start, end, slice_size=SLICE_SIZE):
+    # reader(PieceTable/Snapshot)의 start~end 구간을 줄 경계에 맞춘 조각으로 나눠 찾음
+    # 조각마다 [(위치, 길이), ...] 를 돌려줌 (빈 일치는 건너뜀)
+    for pos, text in line_slices(reader, start, end, slice_size):
+        yield [(pos + match.start(), match.end() - match.start())
+               for match in pattern.finditer(text) if match.end() > match.start()]
+
+
+def line_slices(reader, start, end, slice_size=SLICE_SIZE):
+    # start~end 구간을 줄 경계에서 자른 (시작 위치, 텍스트) 조각으로 나눔
+    # 한 줄이 slice_size 보다 길면 줄 중간에서 자르지 않고 다음 줄바꿈까지 늘려서 읽음
+    pos = start
+    while pos < end:
+        stop = min(end, pos + slice_size)
+        text = reader.text(pos, stop)
+        if stop < end:
+            cut = text.rfind('\n')
+            if cut >= 0:
+                text = text[:cut + 1]
+            else:
+                parts = [text]
+                while stop < end:
+                    more = reader.text(stop, min(end, stop + slice_size))
+                    stop += len(more)
+                    cut = more.find('\n')
+                    if cut >= 0:
+                        parts.append(more[:cut + 1])
+                        break
+                    parts.append(more)
+                text = ''.join(parts)
+        yield pos, text
+        pos += len(text)
+
+
+def search_lines(reader, pattern, slice_size=SLICE_SIZE):
+    # 결과 목록용 - 문서 처음부터 조각마다 (줄, 열, 길이, 줄 시작 위치) array 네 개를 돌려줌
+    # 일치 항목마다 파이썬 객체를 남기지 않으므로 일치가 수백만 개여도 메모리가 작음
+    line = 0
+    for start, text in line_slices(reader, 0, len(reader), slice_size):
+        lines, columns, lengths, line_starts = array('i'), array('i'), array('i'), array('q')
+        counted = 0
+        line_start = 0
+        for match in pattern.finditer(text):
+            position, end = match.span()
+            if end == position:
+                continue
+            newlines = text.count('\n', counted, position)
+            if newlines:
+                line += newlines
+                line_start = text.rfind('\n', counted, position) + 1
+            counted = position
+            lines.append(line)
+            columns.append(position - line_start)
+            lengths.append(end - position)
+            line_starts.append(start + line_start)
+        line += text.count('\n', counted)
+        yield lines, columns, lengths, line_starts
+
+
+def viewport_first(length, start, end):
+    # 화면에 보이는 구간을 먼저, 그 다음 뒤쪽, 마지막으로 앞쪽을 찾도록 구간 순서를 정함
+    ranges = [(start, end), (end, length), (0, start)]
+    return [(a, b) for a, b in ranges if a < b]
@@ -0,0 +1,67 @@
+# -*- mode: python ; coding: utf-8 -*-
+# pyEditor_Qt5_Ver014.py 를 빨리 뜨도록 줄인 빌드 (pyinstaller pyEditor_slim.spec)
+#   - 쓰지 않는 Qt 모듈과 표준 라이브러리 모듈을 빼서 읽어 들일 파일 수를 줄임
+#   - onefile 은 실행할 때마다 임시 폴더에 풀어야 하므로 onedir 로 만듦
+#   - UPX 로 압축한 Qt 라이브러리는 뜰 때마다 압축을 풀어야 하므로 UPX 를 쓰지 않음
+#   - 모든 모듈은 빌드할 때 바이트코드로 컴파일해서 넣음 (optimize=1 은 assert 를 뺌)
+#   - 시작 시간은 python pyEditor_startup.py --frozen dist/pyEditor/pyEditor 로 잼
+import sys
+
+# PyQt5 중에서 QtCore, QtGui, QtWidgets, QtNetwork(한 번만 실행 모드) 만 씀
+qt_excludes = [
+    'PyQt5.' + name for name in (
+        'QtBluetooth', 'QtDBus', 'QtDesigner', 'QtHelp', 'QtLocation', 'QtMultimedia',
+        'QtMultimediaWidgets', 'QtNfc', 'QtOpenGL', 'QtPositioning', 'QtPrintSupport', 'QtQml',
+        'QtQuick', 'QtQuick3D', 'QtQuickWidgets', 'QtRemoteObjects', 'QtSensors', 'QtSerialPort',
+        'QtSql', 'QtSvg', 'QtTest', 'QtTextToSpeech', 'QtWebChannel', 'QtWebEngine',
+        'QtWebEngineCore', 'QtWebEngineWidgets', 'QtWebSockets', 'QtXml', 'QtXmlPatterns',
+        'uic',
+    )
+]
+stdlib_excludes = [
+    'tkinter', 'unittest', 'doctest', 'pydoc', 'pdb', 'lib2to3', 'xmlrpc', 'distutils',
+    'setuptools', 'pip', 'test',
+]
+
+a = Analysis(
+    ['pyEditor_Qt5_Ver014.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    # 함수 안에서 import 하는 모듈 (PyInstaller 가 찾기는 하지만 빠지지 않도록 적어 둠)
+    hiddenimports=['pyEditor_bigfile', 'pyEditor_findfiles', 'pyEditor_codeindex'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=qt_excludes + stdlib_excludes,
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='pyEditor',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=sys.platform != 'win32',
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=sys.platform != 'win32',
+    upx=False,
+    upx_exclude=[],
+    name='pyEditor',
+)
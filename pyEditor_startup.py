@@ -0,0 +1,103 @@
+# pyEditor_startup.py
+# pyEditor 시작 시간 측정 - 프로세스를 띄운 때부터 편집 영역을 처음 그릴 때까지 (Qt 와 무관)
+#   - 편집기를 PYEDITOR_STARTUP_REPORT 환경 변수와 함께 띄우면 StartupProbe 가 단계별 시각을
+#     JSON 파일에 적고 창을 닫음. 여기서는 띄운 시각과 비교해서 단계별 시간을 계산
+#       import   : 모듈 import 가 끝날 때까지 (파이썬 시작 + PyQt + 편집기 모듈)
+#       app      : QApplication 을 만들 때까지
+#       window   : TextEditor 를 만들 때까지 (메뉴, 첫 탭, 세션/자동 저장 기록 확인)
+#       paint    : 편집 영역을 처음 그릴 때까지 (편집할 수 있는 창)
+#   - 실행마다 빈 임시 HOME 과 작업 디렉터리를 써서 세션/자동 저장 기록/로그 파일의 영향을 없앰
+#   - 원본 스크립트와 PyInstaller 빌드(pyEditor_slim.spec)를 같은 방법으로 잴 수 있음
+#
+# 사용 예 (명령행):
+#   python pyEditor_startup.py                                  (원본 스크립트를 5번)
+#   python pyEditor_startup.py --frozen dist/pyEditor/pyEditor --runs 10 --budget 300
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPORT_ENV = 'PYEDITOR_STARTUP_REPORT'      # pyEditor_Qt5_Ver014.py 의 StartupProbe 와 같은 이름
+PHASES = (('import', 'imported'), ('app', 'app'), ('window', 'window'), ('paint', 'painted'))
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pyEditor_Qt5_Ver014.py')
+TIMEOUT = 60
+
+
+def run_once(command, extra_env=None):
+    # 한 번 띄워서 단계별 시간(ms) 을 돌려줌
+    with tempfile.TemporaryDirectory(prefix='pyEditor-startup-') as directory:
+        report = os.path.join(directory, 'report.json')
+        env = dict(os.environ)
+        env.update(extra_env or {})
+        env[REPORT_ENV] = report
+        env['HOME'] = env['USERPROFILE'] = directory
+        env.pop('XDG_RUNTIME_DIR', None)
+
+        start = time.time()
+        process = subprocess.run(command + ['--new-instance'], cwd=directory, env=env, timeout=TIMEOUT,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if not os.path.exists(report):
+            message = process.stderr.decode('utf-8', 'replace').strip().splitlines()
+            raise RuntimeError(f'종료 코드 {process.returncode}: {message[-1] if message else "보고 없음"}')
+        with open(report, encoding='utf-8') as f:
+            marks = json.load(f)
+    return {name: (marks[key] - start) * 1000 for name, key in PHASES}
+
+
+def measure(command, runs, extra_env=None):
+    # 첫 실행은 디스크 캐시를 데우는 용도로 버림
+    run_once(command, extra_env)
+    return [run_once(command, extra_env) for _ in range(runs)]
+
+
+def report(name, results, budget):
+    print(f'{name} ({len(results)}회, ms)')
+    print(f'  {"단계":<8}{"중앙값":>10}{"최소":>10}{"최대":>10}')
+    for phase, _ in PHASES:
+        values = [result[phase] for result in results]
+        print(f'  {phase:<8}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}')
+    paint = statistics.median(result['paint'] for result in results)
+    if budget is not None:
+        print(f'  목표 {budget}ms: {"통과" if paint <= budget else "초과"}')
+    return paint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pyEditor 시작 시간 측정')
+    parser.add_argument('--source', default=SOURCE, help='원본 스크립트 (기본값 pyEditor_Qt5_Ver014.py)')
+    parser.add_argument('--no-source', action='store_true', help='원본 스크립트는 재지 않음')
+    parser.add_argument('--frozen', default=None, help='PyInstaller 로 만든 실행 파일')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=None, help='첫 화면까지 목표 시간(ms) - 넘으면 종료 코드 1')
+    parser.add_argument('--platform', default=None, help='QT_QPA_PLATFORM (예: offscreen)')
+    args = parser.parse_args(argv)
+
+    extra_env = {'QT_QPA_PLATFORM': args.platform} if args.platform else None
+    targets = []
+    if not args.no_source:
+        targets.append(('원본 스크립트', [sys.executable, args.source]))
+    if args.frozen:
+        targets.append(('PyInstaller 빌드', [os.path.abspath(args.frozen)]))
+    if not targets:
+        parser.error('잴 대상이 없습니다')
+
+    over = False
+    for name, command in targets:
+        try:
+            results = measure(command, args.runs, extra_env)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f'{name}: 실패: {e}', file=sys.stderr)
+            over = True
+            continue
+        paint = report(name, results, args.budget)
+        over = over or (args.budget is not None and paint > args.budget)
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# pyEditor_tokenizer.py
+# pyEditor 구문 강조용 한 줄 토크나이저
+#   - 미리 컴파일한 정규식 하나로 줄을 왼쪽에서 오른쪽으로 한 번만 훑음
+#   - 단어 경계를 지킴 (print 안의 in 은 키워드가 아님)
+#   - 결과는 (start, length, kind) 튜플 목록
+#
+# 사용 예:
+#   runs, state = tokenize_line("if a in b: # 주석")
+#
+# 벤치마크:
+#   python pyEditor_tokenizer.py [파일 또는 디렉터리 ...]   (기본값: jump2python-main)
+
+import os
+import re
+import sys
+import time
+
+# 토큰 종류
+KEYWORD = 0
+OPERATOR = 1
+STRING = 2
+COMMENT = 3
+
+# 블록(줄) 상태 - 여러 줄에 걸친 삼중 따옴표 문자열
+STATE_NORMAL = 0
+STATE_TRIPLE_SINGLE = 1
+STATE_TRIPLE_DOUBLE = 2
+
+# 파이썬 키워드
+PYTHON_KEYWORDS = [
+    'and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue', 'def', 'del',
+    'elif', 'else', 'except', 'False', 'finally', 'for', 'from', 'global', 'if', 'import',
+    'in', 'is', 'lambda', 'None', 'nonlocal', 'not', 'or', 'pass', 'raise', 'return',
+    'True', 'try', 'while', 'with', 'yield'
+]
+
+# 파이썬 연산자
+PYTHON_OPERATORS = ['+', '-', '*', '/', '%', '**', '//', '=', '==', '!=', '<', '>', '<=', '>=']
+
+KEYWORD_SET = frozenset(PYTHON_KEYWORDS)
+
+TRIPLE_QUOTES = {STATE_TRIPLE_SINGLE: "'''", STATE_TRIPLE_DOUBLE: '"""'}
+
+# 그룹 순서가 곧 우선순위: 삼중 따옴표 > 문자열 > 주석 > 단어 > 연산자
+TOKEN_RE = re.compile(
+    r"(?P<triple>'''|\"\"\")"
+    r"|(?P<string>'(?:\\.|[^'\\])*'?|\"(?:\\.|[^\"\\])*\"?)"
+    r"|(?P<comment>#.*)"
+    r"|(?P<word>\w+)"
+    r"|(?P<op>" + '|'.join(re.escape(op) for op in sorted(PYTHON_OPERATORS, key=len, reverse=True)) + r")"
+)
+
+
+def tokenize_line(text, state=STATE_NORMAL):
+    # text 한 줄을 토큰 목록으로 바꿈. 반환값: (runs, 다음 줄로 넘길 상태)
+    runs = []
+    append = runs.append
+    pos = 0
+
+    if state in TRIPLE_QUOTES:
+        end = text.find(TRIPLE_QUOTES[state])
+        if end < 0:
+            if text:
+                append((0, len(text), STRING))
+            return runs, state
+        pos = end + 3
+        append((0, pos, STRING))
+
+    match = TOKEN_RE.search(text, pos)
+    while match is not None:
+        kind = match.lastgroup
+        start = match.start()
+
+        if kind == 'word':
+            if match.group() in KEYWORD_SET:
+                append((start, match.end() - start, KEYWORD))
+        elif kind == 'op':
+            append((start, match.end() - start, OPERATOR))
+        elif kind == 'string':
+            append((start, match.end() - start, STRING))
+        elif kind == 'comment':
+            append((start, match.end() - start, COMMENT))
+            break
+        else:
+            quote = match.group()
+            end = text.find(quote, start + 3)
+            if end < 0:
+                append((start, len(text) - start, STRING))
+                return runs, STATE_TRIPLE_SINGLE if quote == "'''" else STATE_TRIPLE_DOUBLE
+            append((start, end + 3 - start, STRING))
+            match = TOKEN_RE.search(text, end + 3)
+            continue
+
+        match = TOKEN_RE.search(text, match.end())
+
+    return runs, STATE_NORMAL
+
+
+def tokenize_lines(lines):
+    # 여러 줄을 차례대로 토큰화 (줄 사이 상태를 이어 줌)
+    state = STATE_NORMAL
+    result = []
+    for line in lines:
+        runs, state = tokenize_line(line, state)
+        result.append(runs)
+    return result
+
+
+def legacy_scan(text):
+    # 기존 MyTextEdit.highlight_python_keywords 의 스캔 방식 (비교용)
+    runs = []
+    for keyword in PYTHON_KEYWORDS:
+        index = text.find(keyword)
+        while index >= 0:
+            runs.append((index, len(keyword), KEYWORD))
+            index = text.find(keyword, index + len(keyword))
+
+    for op in PYTHON_OPERATORS:
+        index = text.find(op)
+        while index >= 0:
+            runs.append((index, len(op), OPERATOR))
+            index = text.find(op, index + len(op))
+
+    index = text.find("#")
+    while index >= 0:
+        runs.append((index, len(text) - index, COMMENT))
+        index = text.find("#", index + 1)
+    return runs
+
+
+def collect_lines(paths):
+    lines = []
+    for path in paths:
+        if os.path.isdir(path):
+            for (dirpath, dirnames, filenames) in os.walk(path):
+                for filename in filenames:
+                    if os.path.splitext(filename)[-1] == '.py':
+                        lines.extend(read_lines(os.path.join(dirpath, filename)))
+        else:
+            lines.extend(read_lines(path))
+    return lines
+
+
+def read_lines(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+def benchmark(lines, repeat=5):
+    # 각 스캐너로 전체 줄을 repeat 번 처리하고 가장 빠른 시간을 돌려줌
+    results = {}
+    for name, scan in (('legacy', lambda: [legacy_scan(line) for line in lines]),
+                       ('tokenizer', lambda: tokenize_lines(lines))):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scan()
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+        results[name] = best
+    return results
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:] or [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jump2python-main')]
+    lines = collect_lines(paths)
+    chars = sum(len(line) for line in lines)
+
+    print("lines: %d, chars: %d" % (len(lines), chars))
+    if not lines:
+        sys.exit(0)
+
+    results = benchmark(lines)
+    for name, elapsed in results.items():
+        print("%-10s %8.2f ms  %6.2f us/line" % (name, elapsed * 1000, elapsed * 1e6 / len(lines)))
+    print("speedup    %8.2fx" % (results['legacy'] / results['tokenizer']))
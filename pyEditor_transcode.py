@@ -0,0 +1,139 @@
+# pyEditor_transcode.py
+# 폴더 아래 텍스트 파일들의 인코딩을 한꺼번에 바꾸는 도구 (Qt 와 무관)
+#   - jump2python-main/07-1/euc_kr.py 처럼 파일 전체를 읽지 않고, 고정 크기 조각을
+#     증분 디코더로 읽어서 바로 새 인코딩으로 씀 (파일 크기와 상관없이 메모리 일정)
+#   - 임시 파일에 다 쓴 뒤 바꿔치기하므로 도중에 디코딩 오류가 나도 원래 파일은 그대로
+#   - 파일 묶음을 여러 프로세스로 나눠서 처리하고, 처리량과 실패한 파일 목록을 알려 줌
+#   - 줄바꿈은 바꾸지 않음 (\r\n 파일은 \r\n 그대로)
+#   - 파일에서 찾기와 달리 build/, 숨김 폴더 등도 건너뛰지 않고 폴더 아래 모든 파일을 바꿈
+#
+# 사용 예 (명령행):
+#   python pyEditor_transcode.py 폴더 [--from cp949] [--to utf-8] [--ext .txt .py] [--workers 4]
+
+import argparse
+import codecs
+import os
+import sys
+import time
+
+import pyEditor_fileio
+import pyEditor_findfiles
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def decoded_chunks(file, encoding, chunk_size=CHUNK_SIZE):
+    # 잘못된 바이트가 있으면 UnicodeDecodeError (위치는 파일 전체 기준으로 고쳐서 알려 줌)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    done = 0
+    while True:
+        data = file.read(chunk_size)
+        try:
+            text = decoder.decode(data, final=not data)
+        except UnicodeDecodeError as e:
+            raise UnicodeDecodeError(e.encoding, e.object, e.start, e.end,
+                                     f'{e.reason} (바이트 {done + e.start})') from None
+        if text:
+            yield text
+        if not data:
+            return
+        done += len(data)
+
+
+def is_wide(encoding):
+    # UTF-16/UTF-32 처럼 ASCII 글자에도 NUL 바이트가 들어가는 인코딩
+    return len('\n'.encode(encoding)) > 1
+
+
+def walk_all(root, extensions=None):
+    # 한 폴더도 거르지 않는 os.walk (일부 파일만 옛 인코딩으로 남으면 안 되므로)
+    for path, dirs, files in os.walk(root):
+        for filename in files:
+            if extensions and os.path.splitext(filename)[-1] not in extensions:
+                continue
+            yield os.path.join(path, filename)
+
+
+def transcode_file(path, source, target, chunk_size=CHUNK_SIZE):
+    # 바이너리 파일이면 건너뛰고 False
+    # (NUL 바이트로 바이너리를 가리므로 원래 인코딩이 UTF-16/32 면 가리지 않음)
+    with open(path, 'rb') as file:
+        if not is_wide(source) and pyEditor_findfiles.is_binary(file.read(pyEditor_findfiles.SNIFF_SIZE)):
+            return False
+        file.seek(0)
+        pyEditor_fileio.atomic_write(path, decoded_chunks(file, source, chunk_size), encoding=target, newline='')
+    return True
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def transcode_files(paths, source, target, chunk_size=CHUNK_SIZE):
+    # 프로세스 풀 작업 단위. 반환값: [(path, 읽은 바이트 수, 오류 메시지 또는 None), ...]
+    # 바이너리라서 건너뛴 파일은 바이트 수가 None
+    results = []
+    for path in paths:
+        size = file_size(path)
+        try:
+            if transcode_file(path, source, target, chunk_size):
+                results.append((path, size, None))
+            else:
+                results.append((path, None, None))
+        except (OSError, UnicodeError, LookupError) as e:
+            results.append((path, 0, str(e)))
+    return results
+
+
+def transcode_tree(root, source, target, extensions=None, workers=None, chunk_size=CHUNK_SIZE):
+    # (path, 읽은 바이트 수, 오류) 를 끝나는 대로 하나씩 돌려줌
+    paths = walk_all(root, extensions)
+    for results in pyEditor_findfiles.run_batches(transcode_files, paths, (source, target, chunk_size), workers):
+        yield from results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pyEditor 폴더 인코딩 변환')
+    parser.add_argument('root')
+    parser.add_argument('--from', dest='source', default='cp949', help='원래 인코딩 (기본값 cp949)')
+    parser.add_argument('--to', dest='target', default='utf-8', help='바꿀 인코딩 (기본값 utf-8)')
+    parser.add_argument('--ext', nargs='*', default=None, help='확장자 (예: .txt .py)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본값 CPU 수)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='한 번에 읽는 바이트 수')
+    args = parser.parse_args(argv)
+
+    # 잘못된 인코딩 이름은 프로세스를 띄우기 전에 알림
+    try:
+        codecs.lookup(args.source)
+        codecs.lookup(args.target)
+    except LookupError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    converted = skipped = total_bytes = 0
+    failures = []
+
+    for path, size, error in transcode_tree(args.root, args.source, args.target, args.ext, args.workers,
+                                            args.chunk_size):
+        if error is not None:
+            failures.append((path, error))
+        elif size is None:
+            skipped += 1
+        else:
+            converted += 1
+            total_bytes += size
+
+    elapsed = time.perf_counter() - start
+    for path, error in failures:
+        print(f'실패: {path}: {error}', file=sys.stderr)
+    print(f'# {converted}개 변환, {skipped}개 건너뜀(바이너리), {len(failures)}개 실패 '
+          f'({elapsed:.2f}s, {total_bytes / 1024 / 1024 / max(elapsed, 1e-9):.1f}MB/s, '
+          f'{converted / max(elapsed, 1e-9):.0f}파일/s)', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# pyEditor_undo.py
+# pyEditor 실행 취소 기록 (Qt 와 무관)
+#   - 편집 하나를 (위치, 지운 텍스트, 넣은 텍스트) 로만 기록하고, 앞뒤로 같은 부분은 잘라 냄
+#     (예: 큰 구간을 거의 같은 텍스트로 바꾸면 실제로 달라진 가운데 부분만 남음)
+#   - 이어서 입력하거나 지운 글자는 한 항목으로 합침
+#   - 메모리에 둔 기록이 예산(budget)을 넘으면 오래된 항목부터 탭마다 하나인 임시 파일로 옮김
+#     (그래도 넘으면 다시 실행 쪽도 가장 나중에 다시 할 항목부터 옮김)
+#   - 구문 강조 같은 서식 변경은 텍스트가 바뀌지 않으므로 기록되지 않음 (record 에서 걸러짐)
+#
+# 사용 예:
+#   history = UndoHistory(budget=8 * 1024 * 1024)
+#   history.record(0, '', 'hello')
+#   for position, removed, added in history.undo(): ...   (거꾸로 되돌릴 편집 목록)
+
+import marshal
+import tempfile
+import time
+import zlib
+
+DIFF_OVERHEAD = 64          # 항목 하나에 드는 대략적인 파이썬 객체 크기
+
+
+def common_prefix(a, b):
+    # a, b 의 앞쪽 공통 길이 - 구간을 두 배씩 늘려 가며 비교하므로 큰 문자열도 C 속도로 비교
+    n = min(len(a), len(b))
+    lo = 0
+    step = 64
+    while lo < n:
+        hi = min(n, lo + step)
+        if a[lo:hi] != b[lo:hi]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+        step *= 2
+    return n
+
+
+def common_suffix(a, b, limit):
+    # a, b 의 뒤쪽 공통 길이 (limit 를 넘지 않음)
+    n = min(len(a), len(b), limit)
+    lo = 0
+    step = 64
+    while lo < n:
+        hi = min(n, lo + step)
+        if a[len(a) - hi:len(a) - lo] != b[len(b) - hi:len(b) - lo]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+        step *= 2
+    return n
+
+
+def compact(position, removed, added):
+    # 지운 텍스트와 넣은 텍스트의 공통 앞뒤를 잘라 낸 (위치, 지운 텍스트, 넣은 텍스트)
+    prefix = common_prefix(removed, added)
+    suffix = common_suffix(removed, added, min(len(removed), len(added)) - prefix)
+    return position + prefix, removed[prefix:len(removed) - suffix], added[prefix:len(added) - suffix]
+
+
+class Entry:
+    # 실행 취소 한 번에 되돌리는 편집 묶음
+    #   diffs 가 None 이면 임시 파일의 offset 에서 length 바이트에 저장되어 있음
+    __slots__ = ('diffs', 'size', 'offset', 'length', 'time', 'mergeable')
+
+    def __init__(self, diffs, mergeable=False):
+        self.diffs = diffs
+        self.size = sum(len(removed) + len(added) for _, removed, added in diffs) * 2 + DIFF_OVERHEAD * len(diffs)
+        self.offset = None
+        self.length = 0
+        self.time = time.monotonic()
+        self.mergeable = mergeable
+
+
+class UndoHistory:
+    MERGE_SECONDS = 2.0     # 이 시간 안에 이어서 입력한 글자는 한 항목으로 합침
+
+    def __init__(self, budget=32 * 1024 * 1024):
+        self.budget = budget
+        self.undo_stack = []
+        self.redo_stack = []
+        self.memory = 0         # 메모리에 있는 항목 크기 합 (대략적인 바이트)
+        self.spilled = 0        # undo_stack 앞쪽에서 임시 파일로 옮긴 항목 수
+        self.redo_spilled = 0   # redo_stack 앞쪽에서 임시 파일로 옮긴 항목 수
+        self.spill_file = None
+        self.group = None       # begin_group ~ end_group 사이의 편집
+        self.group_depth = 0
+        self.clean = 0          # 저장한 시점의 undo_stack 길이 (None 이면 되돌아갈 수 없음)
+
+    def close(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+    def clear(self):
+        self.close()
+        self.undo_stack = []
+        self.redo_stack = []
+        self.memory = 0
+        self.spilled = 0
+        self.redo_spilled = 0
+        self.clean = 0
+
+    def mark_clean(self):
+        self.clean = len(self.undo_stack)
+        self.break_merge()
+
+    def is_clean(self):
+        return self.clean == len(self.undo_stack)
+
+    def break_merge(self):
+        # 다음 입력은 앞 항목과 합치지 않음 (저장, 커서 이동 등)
+        if self.undo_stack:
+            self.undo_stack[-1].mergeable = False
+
+    def begin_group(self):
+        if self.group_depth == 0:
+            self.group = []
+        self.group_depth += 1
+
+    def end_group(self):
+        self.group_depth -= 1
+        if self.group_depth == 0:
+            diffs, self.group = self.group, None
+            if diffs:
+                self.push(Entry(diffs))
+
+    def record(self, position, removed, added):
+        if removed == added:
+            return
+        diff = compact(position, removed, added)
+        if self.group is not None:
+            self.group.append(diff)
+            return
+        if not self.merge(diff):
+            self.push(Entry([diff], mergeable=self.is_typing(diff)))
+
+    @staticmethod
+    def is_typing(diff):
+        position, removed, added = diff
+        text = removed or added
+        return (not removed or not added) and len(text) == 1 and text != '\n'
+
+    def merge(self, diff):
+        # 바로 앞 항목에 이어서 입력하거나 지운 글자면 그 항목에 합침
+        if not self.undo_stack or self.redo_stack or not self.is_typing(diff):
+            return False
+        entry = self.undo_stack[-1]
+        if not entry.mergeable or entry.diffs is None or time.monotonic() - entry.time > self.MERGE_SECONDS:
+            return False
+        if self.clean == len(self.undo_stack):
+            return False
+
+        last_position, last_removed, last_added = entry.diffs[-1]
+        position, removed, added = diff
+        if added and not last_removed and position == last_position + len(last_added):
+            # 이어서 입력
+            entry.diffs[-1] = (last_position, '', last_added + added)
+        elif removed and not last_added and position + len(removed) == last_position:
+            # 백스페이스
+            entry.diffs[-1] = (position, removed + last_removed, '')
+        elif removed and not last_added and position == last_position:
+            # Delete 키
+            entry.diffs[-1] = (position, last_removed + removed, '')
+        else:
+            return False
+
+        entry.size += 2
+        entry.time = time.monotonic()
+        self.memory += 2
+        return True
+
+    def push(self, entry):
+        for old in self.redo_stack:
+            self.memory -= old.size if old.diffs is not None else 0
+        self.redo_stack = []
+        self.redo_spilled = 0
+        if self.clean is not None and self.clean > len(self.undo_stack):
+            self.clean = None   # 저장한 시점이 버려진 다시 실행 쪽에 있었음
+
+        self.undo_stack.append(entry)
+        self.memory += entry.size
+        self.spill()
+
+    def spill(self):
+        # 예산을 넘으면 가장 오래된 항목부터 임시 파일로 옮기고, 그래도 넘으면 다시 실행 쪽도
+        # 가장 나중에 다시 할 항목부터 옮김 (양쪽 다 바로 다음에 쓸 마지막 항목은 남겨 둠)
+        while self.memory > self.budget and self.spilled < len(self.undo_stack) - 1:
+            self.spill_entry(self.undo_stack[self.spilled])
+            self.spilled += 1
+        while self.memory > self.budget and self.redo_spilled < len(self.redo_stack) - 1:
+            self.spill_entry(self.redo_stack[self.redo_spilled])
+            self.redo_spilled += 1
+
+    def spill_entry(self, entry):
+        if entry.diffs is None:
+            return
+        # 한 번 옮긴 항목은 내용이 바뀌지 않으므로 (합치기는 옮기지 않은 마지막 항목에만 함) 다시 쓰지 않음
+        if entry.offset is None:
+            if self.spill_file is None:
+                self.spill_file = tempfile.TemporaryFile(prefix='pyEditor-undo-')
+            data = zlib.compress(marshal.dumps(entry.diffs), 1)
+            self.spill_file.seek(0, 2)
+            entry.offset = self.spill_file.tell()
+            entry.length = len(data)
+            self.spill_file.write(data)
+        entry.diffs = None
+        self.memory -= entry.size
+
+    def spill_all(self):
+        # 탭을 잠재울 때 - 마지막 항목만 남기고 모두 임시 파일로 옮김
+        budget, self.budget = self.budget, 0
+        self.spill()
+        self.budget = budget
+
+    def load(self, entry):
+        if entry.diffs is None:
+            self.spill_file.seek(entry.offset)
+            entry.diffs = marshal.loads(zlib.decompress(self.spill_file.read(entry.length)))
+            self.memory += entry.size
+        return entry.diffs
+
+    def undo(self):
+        # 되돌릴 편집 목록 - 호출하는 쪽은 거꾸로 돌면서 넣은 텍스트를 지운 텍스트로 바꿈
+        if not self.undo_stack:
+            return []
+        entry = self.undo_stack.pop()
+        if self.spilled > len(self.undo_stack):
+            self.spilled = len(self.undo_stack)
+        diffs = self.load(entry)
+        entry.mergeable = False
+        self.redo_stack.append(entry)
+        self.spill()
+        return diffs
+
+    def redo(self):
+        # 다시 할 편집 목록 - 호출하는 쪽은 차례대로 지운 텍스트를 넣은 텍스트로 바꿈
+        if not self.redo_stack:
+            return []
+        entry = self.redo_stack.pop()
+        if self.redo_spilled > len(self.redo_stack):
+            self.redo_spilled = len(self.redo_stack)
+        self.undo_stack.append(entry)
+        diffs = self.load(entry)
+        self.spill()
+        return diffs
@@ -0,0 +1,129 @@
+# test_pyEditor_unicode.py
+# BMP 밖 문자(이모지) 가 있는 문서에서 화면(QTextDocument, UTF-16 위치) 과
+# 버퍼/실행 취소 기록/자동 저장 기록(코드 포인트 위치) 이 같은 텍스트를 유지하는지 확인
+#   python -m pytest -q test_pyEditor_unicode.py
+
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import pyEditor_Qt5_Ver014 as pyEditor
+import pyEditor_fileio
+import pyEditor_journal
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def insert(text_area, position, text, remove=0):
+    cursor = QTextCursor(text_area.document())
+    cursor.setPosition(position)
+    cursor.setPosition(position + remove, QTextCursor.KeepAnchor)
+    cursor.insertText(text)
+
+
+def buffer_text(text_area):
+    return text_area.buffer.snapshot().text()
+
+
+def test_edit_save_undo_after_emoji(app, tmp_path):
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText('ab😀x')
+    text_area.set_recording(True)
+
+    insert(text_area, 5, 'y')               # 'ab😀x' 뒤 (UTF-16 로 5)
+    insert(text_area, 5, 'z', remove=1)     # y -> z
+    assert text_area.toPlainText() == buffer_text(text_area) == 'ab😀xz'
+
+    path = str(tmp_path / 'emoji.txt')
+    pyEditor_fileio.atomic_write(path, text_area.buffer.snapshot().chunks(), encoding='utf-8', newline='\n')
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'ab😀xz'
+
+    text_area.undo()
+    text_area.undo()
+    assert text_area.toPlainText() == buffer_text(text_area) == 'ab😀x'
+    text_area.redo()
+    assert text_area.toPlainText() == buffer_text(text_area) == 'ab😀xy'
+
+
+def test_positions_around_several_emoji(app):
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText('😀a\n🎉b😀c')
+    text_area.set_recording(True)
+
+    insert(text_area, 3, '🙂\n')            # 첫 줄 끝
+    insert(text_area, 0, '', remove=2)      # 맨 앞 이모지 지움
+    insert(text_area, 8, 'X', remove=2)     # 두 번째 줄의 😀 -> X
+    assert text_area.toPlainText() == buffer_text(text_area) == 'a🙂\n\n🎉bXc'
+    assert text_area.to_document(text_area.to_buffer(8)) == 8
+
+    text_area.undo()
+    text_area.undo()
+    text_area.undo()
+    assert text_area.toPlainText() == buffer_text(text_area) == '😀a\n🎉b😀c'
+
+
+def test_replace_all_after_emoji(app):
+    import re
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText('😀 foo 🎉 foo')
+    assert text_area.replace_all(re.compile('foo'), lambda match: 'bar') == 2
+    assert text_area.toPlainText() == buffer_text(text_area) == '😀 bar 🎉 bar'
+
+
+def test_journal_replay_after_emoji(app, tmp_path):
+    journal = pyEditor_journal.Journal(str(tmp_path))
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText('CRASHEDIT😀 file 0')
+    journal.text_base(1, str(tmp_path / 'crash.txt'), 'utf-8', '\n', text_area.buffer.snapshot())
+    text_area.journal = journal
+    text_area.journal_id = 1
+
+    insert(text_area, 12, 'more')           # '😀 ' 뒤
+    journal.close(remove=False)
+
+    recovered = pyEditor_journal.replay(journal.path)
+    assert [tab.text for tab in recovered] == [text_area.toPlainText()] == ['CRASHEDIT😀 morefile 0']
+
+
+def test_search_index_positions_after_emoji(app):
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText('😀 abc\n🎉🎉 abc')
+    while text_area.search_index.pending:
+        text_area.search_index.index_step()
+
+    positions = text_area.search_index.find_all('abc')
+    assert positions == [2, 9]
+    assert [buffer_text(text_area)[position:position + 3] for position in positions] == ['abc', 'abc']
+    assert [text_area.to_document(position) for position in positions] == [3, 12]
+
+
+def test_go_to_line_after_emoji(app):
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText('😀a\nb\n🎉c')
+    text_area.set_recording(True)
+
+    insert(text_area, 3, '\n🙂')            # 첫 줄 끝에 줄 추가
+    assert text_area.buffer.line_count() == text_area.blockCount() == 4
+    for number in range(4):
+        text_area.go_to_line(number)
+        assert text_area.textCursor().position() == text_area.document().findBlockByNumber(number).position()
+
+
+def test_highlight_after_emoji(app):
+    text_area = pyEditor.MyTextEdit()
+    text_area.setPlainText("s = '😀' # 🎉 note\nimport os")
+    block = text_area.document().firstBlock()
+    ranges = sorted((r.start, r.length) for r in block.layout().formats())
+    # 문자열 '😀' 는 UTF-16 으로 4칸, 주석 '# 🎉 note' 는 9칸
+    assert (4, 4) in ranges
+    assert ranges[-1] == (9, 9)